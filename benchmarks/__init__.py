@@ -0,0 +1 @@
+"""Offline benchmarks for the Celcat Calendar integration."""
@@ -0,0 +1,255 @@
+"""Benchmark the hot paths of the Celcat Calendar integration.
+
+Runs offline on synthetic timetables and reports the best time and the peak
+memory of each benchmark. Results can be saved and compared to a previous
+run to catch regressions:
+
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --baseline baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, patch
+from zoneinfo import ZoneInfo
+
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from custom_components.celcat_calendar import calendar, coordinator
+from custom_components.celcat_calendar.const import (
+    CONF_GROUP_BY,
+    DEFAULT_DESCRIPTION,
+    DEFAULT_TITLE,
+    GROUP_BY_CATEGORY_COURSE,
+)
+from custom_components.celcat_calendar.diagnostics import redact_store
+from custom_components.celcat_calendar.diff import diff_events
+from custom_components.celcat_calendar.index import CelcatEventIndex
+from custom_components.celcat_calendar.model import CelcatEvent
+from custom_components.celcat_calendar.render import CelcatEventRenderer
+from custom_components.celcat_calendar.store import decode_events, encode_events
+
+from .synthetic import ACADEMIC_YEAR_START, generate_events
+
+DEFAULT_SIZES = [1_000, 10_000, 50_000, 200_000]
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+TIME_ZONE = "Europe/Paris"
+
+# Middle of the academic year, when the next event is looked up
+NOW = datetime.combine(ACADEMIC_YEAR_START, datetime.min.time()) + timedelta(days=120)
+
+type Benchmark = Callable[[], Any | Awaitable[Any]]
+
+
+def _get_coordinator(events: list[CelcatEvent]) -> Any:
+    """Return a coordinator holding the events, without Home Assistant."""
+    data_coordinator = object.__new__(coordinator.CelcatDataUpdateCoordinator)
+    data_coordinator.hass = SimpleNamespace(config=SimpleNamespace(language="en"))
+    data_coordinator.options = {CONF_GROUP_BY: GROUP_BY_CATEGORY_COURSE}
+    data_coordinator.data = {"all": events}
+    data_coordinator.indexes = {"all": CelcatEventIndex(events)}
+    data_coordinator.renderer = _get_renderer()
+    return data_coordinator
+
+
+def _get_renderer() -> CelcatEventRenderer:
+    """Return a renderer with the default options."""
+    return CelcatEventRenderer(
+        ("en", tuple(DEFAULT_TITLE), tuple(DEFAULT_DESCRIPTION)), {}
+    )
+
+
+def get_benchmarks(events: list[CelcatEvent]) -> dict[str, Benchmark]:
+    """Return the benchmarks over a timetable."""
+    data_coordinator = _get_coordinator(events)
+    entity = calendar.CelcatCalendarEntity(
+        data_coordinator, SimpleNamespace(entry_id="benchmark"), "all"
+    )
+    week_starts = [
+        dt_util.as_local(
+            datetime.combine(ACADEMIC_YEAR_START, datetime.min.time())
+            + timedelta(weeks=week)
+        )
+        for week in range(52)
+    ]
+    stored = json_dumps(encode_events(events))
+    diff, _ = diff_events({}, events)
+
+    def group_events() -> Awaitable[Any]:
+        return data_coordinator._group_events(events)
+
+    def apply_diff() -> Awaitable[Any]:
+        # Like the first refresh, when every event is added
+        empty_coordinator = _get_coordinator([])
+        empty_coordinator.data = None
+        empty_coordinator._groups = {"all": {}}
+        empty_coordinator._event_groups = {}
+        empty_coordinator._stats = None
+        return empty_coordinator._async_apply_diff(diff)
+
+    def index_events() -> None:
+        CelcatEventIndex(events)
+
+    def get_week_events() -> None:
+        for start in week_starts:
+            list(entity._get_date_range_events(start, start + timedelta(weeks=1)))
+
+    def get_next_event() -> None:
+        for _ in range(1000):
+            entity.event  # noqa: B018
+
+    def render_events() -> None:
+        renderer = _get_renderer()
+        for event in events:
+            renderer.render(event)
+
+    def save_store() -> None:
+        json_dumps(encode_events(events))
+
+    def load_store() -> None:
+        decode_events(json_loads(stored))
+
+    def redact() -> None:
+        redact_store(events)
+
+    return {
+        "group_events": group_events,
+        "apply_diff": apply_diff,
+        "index_events": index_events,
+        "get_week_events": get_week_events,
+        "get_next_event": get_next_event,
+        "render_events": render_events,
+        "save_store": save_store,
+        "load_store": load_store,
+        "redact_store": redact,
+    }
+
+
+async def _async_call(benchmark: Benchmark) -> None:
+    """Call a benchmark, waiting for it if it is asynchronous."""
+    result = benchmark()
+    if asyncio.iscoroutine(result):
+        await result
+
+
+async def async_measure(benchmark: Benchmark, repeat: int) -> dict[str, float]:
+    """Return the best time of a benchmark, and its peak memory.
+
+    Memory is traced in a separate run, as tracing slows the code down.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await _async_call(benchmark)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        await _async_call(benchmark)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"time": min(times), "peak": peak}
+
+
+async def async_run(
+    sizes: list[int], repeat: int, only: set[str] | None
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Run the benchmarks for each timetable size."""
+    results: dict[str, dict[str, dict[str, float]]] = {}
+
+    print(f"{'benchmark':<18}{'events':>10}{'time (ms)':>14}{'peak (KiB)':>14}")
+    for size in sizes:
+        events = generate_events(size)
+        for name, benchmark in get_benchmarks(events).items():
+            if only and name not in only:
+                continue
+            result = await async_measure(benchmark, repeat)
+            results.setdefault(name, {})[str(size)] = result
+            print(
+                f"{name:<18}{size:>10}{result['time'] * 1000:>14.2f}"
+                f"{result['peak'] / 1024:>14.0f}"
+            )
+
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    tolerance: float,
+) -> list[str]:
+    """Return the measures which regressed from the baseline."""
+    regressions = []
+    for name, sizes in results.items():
+        for size, result in sizes.items():
+            if (previous := baseline.get(name, {}).get(size)) is None:
+                continue
+            for measure in ("time", "peak"):
+                if result[measure] > previous[measure] * (1 + tolerance):
+                    regressions.append(
+                        f"{name} ({size} events): {measure} went from "
+                        f"{previous[measure]:.6g} to {result[measure]:.6g}"
+                    )
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="numbers of events of the timetables",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--only", nargs="+", help="benchmarks to run")
+    parser.add_argument("--output", help="file to save the results to")
+    parser.add_argument("--baseline", help="results to compare to")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed increase from the baseline, as a fraction",
+    )
+    args = parser.parse_args()
+
+    dt_util.set_default_time_zone(ZoneInfo(TIME_ZONE))
+    with (
+        patch.object(coordinator, "async_get_translations", AsyncMock(return_value={})),
+        patch.object(calendar.dt_util, "now", return_value=dt_util.as_local(NOW)),
+    ):
+        results = asyncio.run(async_run(args.sizes, args.repeat, set(args.only or [])))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if regressions := compare(results, baseline, args.tolerance):
+            print("\nRegressions:", *regressions, sep="\n  ")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
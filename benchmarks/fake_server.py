@@ -0,0 +1,243 @@
+"""Local stand-in for a Celcat server, serving synthetic timetables."""
+
+from __future__ import annotations
+
+import asyncio
+import html
+import random
+import secrets
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from aiohttp import web
+
+from custom_components.celcat_calendar.model import CelcatEvent
+
+from .synthetic import generate_events
+
+PASSWORD = "password"
+SESSION_COOKIE = "ASP.NET_SessionId"
+
+LOGIN_PAGE = """<html><body><form action="/LdapLogin/Logon" method="post">
+<input name="__RequestVerificationToken" type="hidden" value="{token}" />
+</form></body></html>"""
+CALENDAR_PAGE = """<html><body>
+<a class="logInOrOut" href="/Login/Logout"><span>{state}</span></a>
+</body></html>"""
+
+
+@dataclass
+class FakeCelcatUser:
+    """A user of the fake server, with its own timetable."""
+
+    federation_ids: str
+    events: dict[str, CelcatEvent]
+    requests: Counter[str] = field(default_factory=Counter)
+
+
+class FakeCelcatServer:
+    """Serve the Celcat endpoints used by the scraper.
+
+    Every user name logs in with the same password, and gets a timetable of
+    its own over the current academic year. Requests can be slowed down and
+    fail at random, to exercise the rate limiting and retries.
+    """
+
+    def __init__(
+        self,
+        events: int = 1000,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server."""
+        self.event_count = events
+        self.latency = latency
+        self.error_rate = error_rate
+        self.users: dict[str, FakeCelcatUser] = {}
+        self.requests: Counter[str] = Counter()
+        self._seed = seed
+        self._random = random.Random(seed)
+        self._sessions: dict[str, FakeCelcatUser] = {}
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+        today = date.today()
+        self.year_start = date(today.year - (today.month < 9), 9, 1)
+
+        self.app = web.Application()
+        self.app.router.add_get("/LdapLogin", self._handle_login_page)
+        self.app.router.add_post("/LdapLogin/Logon", self._handle_logon)
+        self.app.router.add_get("/Calendar", self._handle_calendar_page)
+        self.app.router.add_get("/Login/Logout", self._handle_logout)
+        self.app.router.add_post("/Home/GetCalendarData", self._handle_calendar_data)
+        self.app.router.add_post("/Home/GetSideBarEvent", self._handle_side_bar_event)
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving, and return the URL of the server."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        # Cookies of IP addresses are ignored by default, so use a host name
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self.url = f"http://localhost:{port}"
+        return self.url
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_user(self, username: str) -> FakeCelcatUser:
+        """Return a user, generating its timetable on its first login."""
+        if username not in self.users:
+            index = len(self.users)
+            events = generate_events(
+                self.event_count, seed=self._seed + index, year_start=self.year_start
+            )
+            self.users[username] = FakeCelcatUser(
+                str(100000 + index), {event.id: event for event in events}
+            )
+        return self.users[username]
+
+    def change_events(self, fraction: float) -> int:
+        """Move a fraction of the events of every user by an hour.
+
+        Returns the number of changed events.
+        """
+        changed = 0
+        for user in self.users.values():
+            for event in self._random.sample(
+                list(user.events.values()), int(len(user.events) * fraction)
+            ):
+                user.events[event.id] = event.copy(
+                    start=event.start + timedelta(hours=1),
+                    end=event.end + timedelta(hours=1),
+                )
+                changed += 1
+        return changed
+
+    async def _async_simulate(self, endpoint: str, can_fail: bool = True) -> None:
+        """Count a request, wait for the latency and fail at random."""
+        self.requests[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * self._random.uniform(0.5, 1.5))
+        if can_fail and self._random.random() < self.error_rate:
+            raise web.HTTPInternalServerError(text="Simulated error")
+
+    def _get_session_user(self, request: web.Request) -> FakeCelcatUser | None:
+        """Return the user logged in by the session of a request."""
+        return self._sessions.get(request.cookies.get(SESSION_COOKIE, ""))
+
+    async def _handle_login_page(self, request: web.Request) -> web.Response:
+        """Return the login form and its CSRF token."""
+        await self._async_simulate("login_page", can_fail=False)
+        return web.Response(
+            text=LOGIN_PAGE.format(token=secrets.token_hex(8)),
+            content_type="text/html",
+        )
+
+    async def _handle_logon(self, request: web.Request) -> web.Response:
+        """Log a user in, and redirect to its calendar."""
+        await self._async_simulate("logon", can_fail=False)
+        form = await request.post()
+        if form.get("Password") != PASSWORD or not form.get("Name"):
+            return web.Response(
+                text=CALENDAR_PAGE.format(state="Log In"), content_type="text/html"
+            )
+
+        user = self.get_user(str(form["Name"]))
+        session = secrets.token_hex(16)
+        self._sessions[session] = user
+
+        response = web.HTTPFound(
+            f"/Calendar?LoggedIn=true&FederationIds={user.federation_ids}"
+        )
+        response.set_cookie(SESSION_COOKIE, session)
+        raise response
+
+    async def _handle_calendar_page(self, request: web.Request) -> web.Response:
+        """Return the calendar page of a logged in user."""
+        state = "Log Out" if self._get_session_user(request) else "Log In"
+        return web.Response(
+            text=CALENDAR_PAGE.format(state=state), content_type="text/html"
+        )
+
+    async def _handle_logout(self, request: web.Request) -> web.Response:
+        """Log the user of a session out."""
+        self._sessions.pop(request.cookies.get(SESSION_COOKIE, ""), None)
+        return web.Response(
+            text=CALENDAR_PAGE.format(state="Log In"), content_type="text/html"
+        )
+
+    async def _handle_calendar_data(self, request: web.Request) -> web.Response:
+        """Return the raw events of a date range."""
+        await self._async_simulate("calendar_data")
+        if (user := self._get_session_user(request)) is None:
+            # Celcat shows the login page to expired sessions
+            return await self._handle_login_page(request)
+        user.requests["calendar_data"] += 1
+
+        form = await request.post()
+        start = datetime.fromisoformat(str(form["start"]))
+        end = datetime.fromisoformat(str(form["end"])) + timedelta(days=1)
+
+        return web.json_response(
+            [
+                _get_raw_event(event)
+                for event in user.events.values()
+                if event.end >= start and event.start < end
+            ]
+        )
+
+    async def _handle_side_bar_event(self, request: web.Request) -> web.Response:
+        """Return the details of an event."""
+        await self._async_simulate("side_bar_event")
+        if (user := self._get_session_user(request)) is None:
+            return await self._handle_login_page(request)
+        user.requests["side_bar_event"] += 1
+
+        form = await request.post()
+        if (event := user.events.get(str(form["eventid"]))) is None:
+            raise web.HTTPNotFound
+
+        return web.json_response({"elements": _get_side_bar_elements(event)})
+
+
+def _get_raw_event(event: CelcatEvent) -> dict[str, Any]:
+    """Return an event as returned by the calendar data endpoint."""
+    description = "<br />".join(
+        html.escape(part) for part in (event.category, *event.rooms, event.course)
+    )
+    return {
+        "id": event.id,
+        "start": event.start.isoformat(),
+        "end": event.end.isoformat(),
+        "allDay": event.all_day,
+        "description": description,
+        "eventCategory": event.category,
+        "modules": event.modules or None,
+        "department": event.department,
+        "sites": event.sites,
+        "faculty": event.faculty,
+    }
+
+
+def _get_side_bar_elements(event: CelcatEvent) -> list[dict[str, Any]]:
+    """Return the elements of an event as returned by the side bar endpoint."""
+    elements = [{"entityType": 100, "content": event.course, "isNotes": False}]
+    elements.extend(
+        {"entityType": 101, "content": professor, "isNotes": False}
+        for professor in event.professors
+    )
+    elements.extend(
+        {"entityType": 102, "content": room, "isNotes": False} for room in event.rooms
+    )
+    if event.notes:
+        elements.append({"entityType": 0, "content": event.notes, "isNotes": True})
+    return elements
@@ -0,0 +1,228 @@
+"""Load test of Celcat Calendar refreshes against a local fake Celcat server.
+
+Sets up config entries like the integration does, without their calendars,
+and refreshes them all at once for a few rounds. Reports the refresh
+latency, the requests made to the server per refresh and the event loop lag:
+
+    python -m benchmarks.load --entries 10 --events 2000 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any
+
+from celcat_scraper import CelcatConfig, CelcatFilterConfig, CelcatScraperAsync
+
+from homeassistant import loader
+from homeassistant.const import CONF_NAME, CONF_PASSWORD, CONF_URL, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.celcat_calendar.const import CONF_NEAR_TERM_DAYS, DOMAIN
+from custom_components.celcat_calendar.coordinator import (
+    CelcatData,
+    CelcatDataUpdateCoordinator,
+)
+from custom_components.celcat_calendar.pool import async_get_pool, async_release_pool
+from custom_components.celcat_calendar.store import async_get_store
+
+from .fake_server import PASSWORD, FakeCelcatServer
+
+LAG_INTERVAL = 0.01
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop runs a periodic callback."""
+
+    def __init__(self, interval: float = LAG_INTERVAL) -> None:
+        """Initialize the monitor."""
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start measuring."""
+        self._task = asyncio.get_running_loop().create_task(self._async_monitor())
+
+    async def _async_monitor(self) -> None:
+        """Sleep for the interval, and record how much longer it took."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - start - self.interval)
+
+    def pop_samples(self) -> list[float]:
+        """Return the samples since the last call."""
+        samples, self.samples = self.samples, []
+        return samples
+
+    def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def async_setup_coordinator(
+    hass: HomeAssistant, entry: Any, rate_limit: float
+) -> CelcatDataUpdateCoordinator:
+    """Set up an entry like the integration does, without its calendars."""
+    store = await async_get_store(hass, entry.entry_id, False)
+
+    pool = async_get_pool(hass, entry.data[CONF_URL])
+    pool.budget.delay = rate_limit
+    celcat = CelcatScraperAsync(
+        CelcatConfig(
+            url=entry.data[CONF_URL],
+            username=entry.data[CONF_USERNAME],
+            password=entry.data[CONF_PASSWORD],
+            include_holidays=False,
+            session=pool.get_session(entry.entry_id),
+            filter_config=CelcatFilterConfig(),
+        )
+    )
+    pool.attach(entry.entry_id, celcat)
+
+    entry.runtime_data = CelcatData(celcat, store, None)
+    coordinator = CelcatDataUpdateCoordinator(hass, entry)
+    entry.runtime_data.coordinator = coordinator
+
+    await coordinator.async_restore_auth()
+    await coordinator.async_load_cached_data()
+    return coordinator
+
+
+async def _async_refresh(coordinator: CelcatDataUpdateCoordinator) -> float:
+    """Refresh a coordinator, and return how long it took."""
+    start = time.perf_counter()
+    await coordinator.async_refresh()
+    return time.perf_counter() - start
+
+
+def _describe(values: list[float], unit: float = 1000) -> str:
+    """Return the mean, 95th percentile and maximum of values, in ms."""
+    if not values:
+        return "-"
+    p95 = statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+    return (
+        f"mean {statistics.fmean(values) * unit:.1f} "
+        f"p95 {p95 * unit:.1f} max {max(values) * unit:.1f}"
+    )
+
+
+async def async_run(args: argparse.Namespace) -> None:
+    """Run the load test."""
+    server = FakeCelcatServer(
+        events=args.events, latency=args.latency, error_rate=args.error_rate
+    )
+    url = await server.async_start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+        hass.data.setdefault(DOMAIN, {})
+
+        entries = [
+            SimpleNamespace(
+                entry_id=f"load{index}",
+                data={
+                    CONF_NAME: f"Load {index}",
+                    CONF_URL: url,
+                    CONF_USERNAME: f"user{index}",
+                    CONF_PASSWORD: PASSWORD,
+                },
+                options={CONF_NEAR_TERM_DAYS: 0} if args.full else {},
+                runtime_data=None,
+            )
+            for index in range(args.entries)
+        ]
+        coordinators = [
+            await async_setup_coordinator(hass, entry, args.rate_limit)
+            for entry in entries
+        ]
+
+        monitor = LoopLagMonitor()
+        monitor.start()
+        try:
+            for round_index in range(args.rounds):
+                if round_index and args.change_rate:
+                    server.change_events(args.change_rate)
+
+                requests = {
+                    username: user.requests.copy()
+                    for username, user in server.users.items()
+                }
+                durations = await asyncio.gather(
+                    *(_async_refresh(coordinator) for coordinator in coordinators)
+                )
+                lag = monitor.pop_samples()
+
+                per_refresh = [
+                    user.requests.total() - requests.get(username, Counter()).total()
+                    for username, user in server.users.items()
+                ]
+                failed = sum(
+                    not coordinator.last_update_success for coordinator in coordinators
+                )
+                print(
+                    f"Round {round_index + 1}: {len(coordinators)} refreshes, "
+                    f"{failed} failed\n"
+                    f"  refresh latency (ms): {_describe(durations)}\n"
+                    f"  requests per refresh: "
+                    f"{_describe([float(count) for count in per_refresh], 1)}\n"
+                    f"  event loop lag (ms): {_describe(lag)}"
+                )
+        finally:
+            monitor.stop()
+            for entry in entries:
+                await entry.runtime_data.store.async_flush()
+                await async_release_pool(hass, url, entry.entry_id)
+            await server.async_stop()
+
+    print(f"Server requests: {dict(server.requests)}")
+
+
+def main() -> int:
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5)
+    parser.add_argument("--events", type=int, default=500, help="events per entry")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="mean server latency, in s"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of failed requests"
+    )
+    parser.add_argument(
+        "--change-rate",
+        type=float,
+        default=0.01,
+        help="fraction of the events changed between rounds",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0.0,
+        help="delay between requests to the server, in s",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="refresh the whole year every round"
+    )
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    asyncio.run(async_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Deterministic generator of synthetic Celcat timetables."""
+
+from __future__ import annotations
+
+import random
+from datetime import date, datetime, timedelta
+
+from custom_components.celcat_calendar.model import CelcatEvent
+
+ACADEMIC_YEAR_START = date(2025, 9, 1)
+ACADEMIC_YEAR_DAYS = 365
+
+CATEGORIES = ["CM", "TD", "TP", "Examen", "Projet", "Réunion"]
+SUBJECTS = [
+    "Mathématiques",
+    "Physique",
+    "Chimie",
+    "Biologie",
+    "Informatique",
+    "Anglais",
+    "Économie",
+    "Droit",
+    "Histoire",
+    "Géographie",
+    "Mécanique",
+    "Électronique",
+    "Statistiques",
+    "Philosophie",
+    "Sociologie",
+]
+LEVELS = ["L1", "L2", "L3", "M1", "M2"]
+LAST_NAMES = [
+    "MARTIN",
+    "BERNARD",
+    "DUBOIS",
+    "THOMAS",
+    "ROBERT",
+    "RICHARD",
+    "PETIT",
+    "DURAND",
+    "LEROY",
+    "MOREAU",
+    "SIMON",
+    "LAURENT",
+    "LEFEBVRE",
+    "MICHEL",
+    "GARCIA",
+]
+FIRST_NAMES = ["Marie", "Jean", "Anne", "Pierre", "Claire", "Louis", "Julie", "Paul"]
+HOLIDAYS = ["Vacances de la Toussaint", "Vacances de Noël", "Vacances d'hiver"]
+
+
+def _get_cardinalities(count: int) -> dict[str, int]:
+    """Return the number of distinct values of each attribute.
+
+    A student timetable holds about a thousand events a year, with a few
+    dozen courses, rooms and professors. Bigger timetables share those
+    between more events, as when an entry follows a whole department.
+    """
+    return {
+        "courses": max(20, count // 40),
+        "rooms": max(15, count // 150),
+        "professors": max(20, count // 100),
+        "modules": max(10, count // 200),
+        "sites": max(2, min(count // 20000, 10)),
+        "departments": max(3, min(count // 5000, 40)),
+    }
+
+
+def generate_events(
+    count: int, seed: int = 0, year_start: date = ACADEMIC_YEAR_START
+) -> list[CelcatEvent]:
+    """Return a timetable of synthetic events over an academic year.
+
+    The same count, seed and year always return the same events. Events are
+    naive, like the events fetched from Celcat.
+    """
+    rnd = random.Random(seed)
+    cardinalities = _get_cardinalities(count)
+
+    courses = [
+        f"{rnd.choice(SUBJECTS)} {rnd.choice(LEVELS)} S{index % 2 + 1} G{index}"
+        for index in range(cardinalities["courses"])
+    ]
+    rooms = [
+        f"{chr(65 + index % 8)}{index // 8 % 5}{index:03d} - Salle {index}"
+        for index in range(cardinalities["rooms"])
+    ]
+    professors = [
+        f"{rnd.choice(LAST_NAMES)} {rnd.choice(FIRST_NAMES)} {index}"
+        for index in range(cardinalities["professors"])
+    ]
+    modules = [
+        f"DP{rnd.choice(SUBJECTS)[:3].upper()}{index}D"
+        for index in range(cardinalities["modules"])
+    ]
+    sites = [f"Campus {index + 1}" for index in range(cardinalities["sites"])]
+    departments = [
+        f"Département {index + 1}" for index in range(cardinalities["departments"])
+    ]
+    faculty = "Faculté des Sciences"
+
+    events = []
+    for index in range(count):
+        day = year_start + timedelta(days=rnd.randrange(ACADEMIC_YEAR_DAYS))
+        if day.weekday() >= 5:
+            day -= timedelta(days=day.weekday() - 4)
+
+        if rnd.random() < 0.005:
+            # Holidays span a whole week
+            start = datetime.combine(day, datetime.min.time())
+            events.append(
+                CelcatEvent(
+                    id=f"-{1_000_000 + index}",
+                    start=start,
+                    end=start + timedelta(days=7),
+                    all_day=True,
+                    category="Vacances",
+                    course=rnd.choice(HOLIDAYS),
+                    rooms=[],
+                    professors=[],
+                    modules=[],
+                    department="",
+                    sites=[],
+                    faculty=faculty,
+                    notes="",
+                )
+            )
+            continue
+
+        start = datetime.combine(day, datetime.min.time()) + timedelta(
+            minutes=8 * 60 + 30 * rnd.randrange(20)
+        )
+        category = rnd.choice(CATEGORIES)
+        events.append(
+            CelcatEvent(
+                id=f"-{1_000_000 + index}",
+                start=start,
+                end=start + timedelta(minutes=30 * rnd.randint(2, 8)),
+                all_day=False,
+                category=category,
+                course=f"{rnd.choice(courses)} {category}",
+                rooms=rnd.sample(rooms, rnd.choice([1, 1, 1, 2])),
+                professors=rnd.sample(professors, rnd.choice([0, 1, 1, 2])),
+                modules=rnd.sample(modules, rnd.choice([0, 1])),
+                department=rnd.choice(departments),
+                sites=[rnd.choice(sites)],
+                faculty=faculty,
+                notes=rnd.choice(["", "", "", "Apporter un ordinateur"]),
+            )
+        )
+
+    return events
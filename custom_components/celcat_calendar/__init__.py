@@ -8,88 +8,120 @@ from celcat_scraper import (
     CelcatConfig,
     CelcatFilterConfig,
     CelcatScraperAsync,
-    FilterType,
 )
 
 from homeassistant.const import CONF_PASSWORD, CONF_URL, CONF_USERNAME, Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
-    CONF_FILTERS,
-    CONF_REPLACEMENTS,
+    CONF_SHARDED_STORAGE,
     CONF_SHOW_HOLIDAYS,
-    DEFAULT_FILTERS,
-    DEFAULT_REPLACEMENTS,
+    DEFAULT_SHARDED_STORAGE,
     DEFAULT_SHOW_HOLIDAYS,
     DOMAIN,
     REMEMBERED_STRIPS,
 )
 from .coordinator import CelcatConfigEntry, CelcatData, CelcatDataUpdateCoordinator
-from .store import CelcatStore
-from .util import list_to_dict
+from .pool import async_get_pool, async_release_pool
+from .services import async_setup_services
+from .store import CelcatShardedStore, CelcatStore, async_get_store
 
-PLATFORMS: list[Platform] = [Platform.CALENDAR]
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Celcat Calendar services."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: CelcatConfigEntry) -> bool:
     """Set up Celcat Calendar from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
-    filter_types = []
-    for filter_string in entry.options.get(CONF_FILTERS, DEFAULT_FILTERS):
-        try:
-            filter_types.append(FilterType(filter_string))
-        except ValueError:
-            _LOGGER.warning("Ignoring invalid filter: %s", filter_string)
-
-    replacements = await list_to_dict(
-        entry.options.get(CONF_REPLACEMENTS, DEFAULT_REPLACEMENTS)
-    )
-    filter_config = CelcatFilterConfig(
-        filters=filter_types,
-        course_remembered_strips=entry.data.get(REMEMBERED_STRIPS, []),
-        course_replacements=replacements,
+    store = await async_get_store(
+        hass,
+        entry.entry_id,
+        entry.options.get(CONF_SHARDED_STORAGE, DEFAULT_SHARDED_STORAGE),
     )
 
-    celcat = CelcatScraperAsync(
-        CelcatConfig(
-            url=entry.data[CONF_URL],
-            username=entry.data[CONF_USERNAME],
-            password=entry.data[CONF_PASSWORD],
-            include_holidays=entry.options.get(
-                CONF_SHOW_HOLIDAYS, DEFAULT_SHOW_HOLIDAYS
-            ),
-            rate_limit=0.1,
-            session=async_get_clientsession(hass),
-            filter_config=filter_config,
+    if REMEMBERED_STRIPS in entry.data:
+        # Move the strips out of the config entry, which shouldn't change at
+        # every refresh
+        data = dict(entry.data)
+        if await store.async_load_remembered_strips() is None:
+            await store.async_save_remembered_strips(data[REMEMBERED_STRIPS])
+        del data[REMEMBERED_STRIPS]
+        hass.config_entries.async_update_entry(entry, data=data)
+
+    pool = async_get_pool(hass, entry.data[CONF_URL])
+    try:
+        celcat = CelcatScraperAsync(
+            CelcatConfig(
+                url=entry.data[CONF_URL],
+                username=entry.data[CONF_USERNAME],
+                password=entry.data[CONF_PASSWORD],
+                include_holidays=entry.options.get(
+                    CONF_SHOW_HOLIDAYS, DEFAULT_SHOW_HOLIDAYS
+                ),
+                session=pool.get_session(entry.entry_id),
+                # Events are filtered by the coordinator, which keeps them raw
+                filter_config=CelcatFilterConfig(),
+            )
+        )
+        pool.attach(entry.entry_id, celcat)
+
+        entry.runtime_data = CelcatData(celcat, store, None)
+
+        coordinator = CelcatDataUpdateCoordinator(hass, entry)
+        entry.runtime_data.coordinator = coordinator
+        entry.async_on_unload(coordinator.archive.async_unload)
+
+        await coordinator.async_restore_auth()
+        cached = await coordinator.async_load_cached_data()
+        if not cached:
+            await coordinator.async_config_entry_first_refresh()
+
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        # The session is only released on unload once the entry was set up
+        await async_release_pool(hass, entry.data[CONF_URL], entry.entry_id)
+        raise
+
+    if cached:
+        # Serve the cached events at once and refresh them in the background
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_refresh_cached_data(),
+            f"{DOMAIN} refresh {entry.entry_id}",
         )
-    )
-
-    store = CelcatStore(hass, entry.entry_id)
-
-    entry.runtime_data = CelcatData(celcat, store, None)
-
-    coordinator = CelcatDataUpdateCoordinator(hass, entry)
-    entry.runtime_data.coordinator = coordinator
-
-    await coordinator.async_config_entry_first_refresh()
-
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: CelcatConfigEntry) -> bool:
-    """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        await entry.runtime_data.client.close()
+    """Unload a config entry.
+
+    The Celcat session is not logged out, so that its saved authentication
+    can be reused on the next setup.
+    """
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        await entry.runtime_data.store.async_flush()
+        await async_release_pool(hass, entry.data[CONF_URL], entry.entry_id)
     return unload_ok
 
 
 async def async_remove_entry(hass: HomeAssistant, entry: CelcatConfigEntry) -> None:
     """Handle removal of an entry."""
-    store = CelcatStore(hass, entry.entry_id)
-    await store.async_remove()
+    for store in (
+        CelcatStore(hass, entry.entry_id),
+        CelcatShardedStore(hass, entry.entry_id),
+    ):
+        await store.async_remove()
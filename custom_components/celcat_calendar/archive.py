@@ -0,0 +1,154 @@
+"""Archive of the events of past academic years for Celcat Calendar."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .index import CelcatEventIndex
+from .model import CelcatEvent
+from .store import CelcatEventStore
+
+_LOGGER = logging.getLogger(__name__)
+
+ACADEMIC_YEAR_START_MONTH = 9
+ARCHIVE_IDLE_TIME = timedelta(minutes=10)
+
+
+def get_academic_year(day: date) -> int:
+    """Return the year in which the academic year of a day started."""
+    return day.year - (day.month < ACADEMIC_YEAR_START_MONTH)
+
+
+def get_academic_year_start(year: int) -> date:
+    """Return the first day of an academic year."""
+    return date(year, ACADEMIC_YEAR_START_MONTH, 1)
+
+
+class CelcatArchive:
+    """Events of the past academic years, kept out of memory until needed.
+
+    Events are archived by the academic year they start in, once that year
+    is over. The archive is loaded when a range before the current academic
+    year is requested, and unloaded once it was not used for a while. Only
+    the last retained years are kept.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, store: CelcatEventStore, retained_years: int
+    ) -> None:
+        """Initialize the archive."""
+        self.hass = hass
+        self.retained_years = retained_years
+        self._store = store
+        self._years: dict[str, list[CelcatEvent]] | None = None
+        self._indexes: dict[str, CelcatEventIndex] = {}
+        self._lock = asyncio.Lock()
+        self._unsub_unload: CALLBACK_TYPE | None = None
+
+    async def _async_load(self) -> dict[str, list[CelcatEvent]]:
+        """Load the archived years, and keep them until the archive is idle."""
+        async with self._lock:
+            if self._years is None:
+                self._years = {}
+                for event in await self._store.async_load_archive():
+                    year = str(get_academic_year(event.start.date()))
+                    self._years.setdefault(year, []).append(event)
+                self._indexes = {
+                    year: CelcatEventIndex(events)
+                    for year, events in self._years.items()
+                }
+                _LOGGER.debug("Loaded %s archived years", len(self._years))
+                if self._drop_expired_years(self._years):
+                    await self._async_save(self._years)
+
+        if self._unsub_unload is not None:
+            self._unsub_unload()
+        self._unsub_unload = async_call_later(
+            self.hass, ARCHIVE_IDLE_TIME, self._async_handle_idle
+        )
+        return self._years
+
+    @callback
+    def _async_handle_idle(self, _: datetime) -> None:
+        """Unload the archive once it was not used for a while."""
+        self._unsub_unload = None
+        self.async_unload()
+
+    @callback
+    def async_unload(self) -> None:
+        """Drop the archived events from memory.
+
+        Changes not yet written are kept by the store.
+        """
+        if self._unsub_unload is not None:
+            self._unsub_unload()
+            self._unsub_unload = None
+        if self._years is not None:
+            _LOGGER.debug("Unloading %s archived years", len(self._years))
+        self._years = None
+        self._indexes = {}
+        self._store.unload_archive()
+
+    async def _async_save(self, years: dict[str, list[CelcatEvent]]) -> None:
+        """Save the events of the archived years."""
+        await self._store.async_save_archive(
+            [event for _, events in sorted(years.items()) for event in events]
+        )
+
+    def _drop_expired_years(self, years: dict[str, list[CelcatEvent]]) -> bool:
+        """Drop the years which are no longer retained.
+
+        Returns whether years were dropped.
+        """
+        first_year = get_academic_year(dt_util.now().date()) - self.retained_years
+        expired_years = [year for year in years if int(year) < first_year]
+        for year in expired_years:
+            _LOGGER.debug("Dropping the archived events of %s", year)
+            del years[year]
+            self._indexes.pop(year, None)
+        return bool(expired_years)
+
+    async def async_add(self, events: list[CelcatEvent]) -> None:
+        """Archive the events of finished academic years.
+
+        Archived events with the same id are replaced, and the years which
+        are no longer retained are dropped.
+        """
+        years = await self._async_load()
+        added: dict[str, dict[str, CelcatEvent]] = {}
+        for event in events:
+            year = str(get_academic_year(event.start.date()))
+            added.setdefault(year, {})[event.id] = event
+
+        for year, year_events in added.items():
+            previous = {event.id: event for event in years.get(year, [])}
+            years[year] = list((previous | year_events).values())
+            self._indexes[year] = CelcatEventIndex(years[year])
+        self._drop_expired_years(years)
+
+        _LOGGER.debug(
+            "Archived %s events of past academic years %s", len(events), sorted(added)
+        )
+        await self._async_save(years)
+
+    async def async_get_events(
+        self, start: datetime, end: datetime
+    ) -> list[CelcatEvent]:
+        """Return the archived events overlapping a naive datetime range."""
+        await self._async_load()
+        return [
+            event
+            for _, index in sorted(self._indexes.items())
+            for event in index.between(start, end)
+        ]
+
+    async def async_get_all_events(self) -> list[CelcatEvent]:
+        """Return the events of all the archived years."""
+        years = await self._async_load()
+        return [event for _, events in sorted(years.items()) for event in events]
@@ -4,27 +4,21 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Iterator
-from datetime import datetime, time
-from typing import Any
+from itertools import chain
+from datetime import datetime
 
 from homeassistant.components.calendar import CalendarEntity, CalendarEvent
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.translation import async_get_translations
 from homeassistant.util import dt as dt_util
 
 from . import CelcatConfigEntry
-from .const import (
-    ATTRIBUTES_SINGULAR,
-    CONF_DESCRIPTION,
-    CONF_TITLE,
-    DEFAULT_DESCRIPTION,
-    DEFAULT_TITLE,
-    DOMAIN,
-)
+from .const import DOMAIN
 from .coordinator import CelcatDataUpdateCoordinator
-from .util import get_translation
+from .model import CelcatEvent
+from .util import as_wall_clock
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,32 +30,89 @@ async def async_setup_entry(
 ) -> None:
     """Set up the celcat calendar platform."""
     coordinator = entry.runtime_data.coordinator
+    entities: dict[str, CelcatCalendarEntity] = {}
+    # Empty groups whose calendars are kept for their archived events, or
+    # until they are checked
+    archived_groups: set[str] = set()
+
+    # Calendars kept for their archived events are restored from the registry,
+    # so that the archive is not loaded at setup
+    entity_registry = er.async_get(hass)
+    for registry_entry in er.async_entries_for_config_entry(
+        entity_registry, entry.entry_id
+    ):
+        category = _get_category(entry.entry_id, registry_entry.unique_id)
+        if (
+            registry_entry.domain == "calendar"
+            and category is not None
+            and category not in coordinator.data
+        ):
+            archived_groups.add(category)
+
+    async def async_remove_empty_group(category: str) -> None:
+        """Remove the calendar of an empty group, unless it has archived events."""
+        if await coordinator.async_has_archived_events(category):
+            _LOGGER.debug("Keeping calendar of group %s for its archives", category)
+            return
+        archived_groups.discard(category)
+        if category in coordinator.data or category not in entities:
+            return
+
+        entity = entities.pop(category)
+        _LOGGER.debug("Removing calendar of empty group %s", category)
+        if entity.registry_entry is not None:
+            entity_registry.async_remove(entity.entity_id)
+        else:
+            await entity.async_remove()
+
+    @callback
+    def async_update_groups() -> None:
+        """Add calendars for new groups and remove the ones of empty groups."""
+        archived_groups.difference_update(coordinator.data)
+        new_entities = [
+            CelcatCalendarEntity(coordinator, entry, category)
+            for category in chain(coordinator.data, archived_groups)
+            if category not in entities
+        ]
+        if new_entities:
+            entities.update((entity.category, entity) for entity in new_entities)
+            async_add_entities(new_entities, True)
+
+        for category in entities:
+            if category not in coordinator.data and category not in archived_groups:
+                # Checked once, until the group has events again
+                archived_groups.add(category)
+                entry.async_create_background_task(
+                    hass,
+                    async_remove_empty_group(category),
+                    f"{DOMAIN} remove calendar {category}",
+                )
+
+    async_update_groups()
+    entry.async_on_unload(coordinator.async_add_listener(async_update_groups))
 
-    translations = await async_get_translations(
-        hass,
-        hass.config.language,
-        category="selector",
-        integrations=[DOMAIN],
-    )
 
-    entities = [
-        CelcatCalendarEntity(coordinator, entry, category, translations)
-        for category in coordinator.data
-    ]
-    async_add_entities(entities, True)
+def _get_category(entry_id: str, unique_id: str) -> str | None:
+    """Return the group of a calendar from its unique id."""
+    if unique_id == f"{entry_id}-calendar":
+        return "all"
+    prefix, suffix = f"{entry_id}-", "-calendar"
+    if unique_id.startswith(prefix) and unique_id.endswith(suffix):
+        return unique_id[len(prefix) : -len(suffix)]
+    return None
 
 
 class CelcatCalendarEntity(CalendarEntity):
     """A calendar entity by Celcat."""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
 
     def __init__(
         self,
         coordinator: CelcatDataUpdateCoordinator,
         entry: CelcatConfigEntry,
         category: str,
-        translations: dict[str, str],
     ) -> None:
         """Initialize Celcat."""
         self.coordinator = coordinator
@@ -80,19 +131,28 @@ class CelcatCalendarEntity(CalendarEntity):
             len(coordinator.data) == 1 or category != "all"
         )
         self.category = category
-        self.translations = translations
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the events of this calendar changed."""
+        if self.category in self.coordinator.changed_groups:
+            self.async_write_ha_state()
 
     @property
     def event(self) -> CalendarEvent | None:
         """Return the next upcoming event."""
-        events = self.coordinator.data.get(self.category, [])
-
-        if not events:
+        index = self.coordinator.indexes.get(self.category)
+        if index is None:
             return None
 
-        next_event = next(
-            (event for event in events if event["end"] >= dt_util.now()), None
-        )
+        next_event = index.next_event(as_wall_clock(dt_util.now()))
         return self._get_calendar_event(next_event) if next_event else None
 
     async def async_get_events(
@@ -102,94 +162,31 @@ class CelcatCalendarEntity(CalendarEntity):
         end_date: datetime,
     ) -> list[CalendarEvent]:
         """Return calendar events within a datetime range."""
+        events = [
+            self._get_calendar_event(event, cache=False)
+            for event in await self.coordinator.async_get_archived_events(
+                self.category, start_date, end_date
+            )
+        ]
         if not self.coordinator.data.get(self.category):
-            return []
+            return events
 
-        events = []
         for event in self._get_date_range_events(start_date, end_date):
             events.append(self._get_calendar_event(event))
         return events
 
     def _get_date_range_events(
         self, start: datetime, end: datetime
-    ) -> Iterator[dict[str, Any]]:
+    ) -> Iterator[CelcatEvent]:
         """Get events within the specified date range."""
-        range_start = start
-        range_end = end
-
-        for event in self.coordinator.data.get(self.category, []):
-            event_start = (
-                event["start"]
-                if isinstance(event["start"], datetime)
-                else datetime.combine(event["start"], time.min)
-            )
-            event_end = (
-                event["end"]
-                if isinstance(event["end"], datetime)
-                else datetime.combine(event["end"], time.max)
-            )
+        index = self.coordinator.indexes.get(self.category)
+        if index is None:
+            return iter(())
 
-            if event_end >= range_start and event_start <= range_end:
-                yield event
+        return index.between(as_wall_clock(start), as_wall_clock(end))
 
-    def _get_calendar_event(self, event: dict[str, Any]) -> CalendarEvent:
+    def _get_calendar_event(
+        self, event: CelcatEvent, cache: bool = True
+    ) -> CalendarEvent:
         """Return a CalendarEvent from an API event."""
-        title_parts = self._assemble_attributes(
-            event,
-            self.entry.options.get(
-                CONF_TITLE,
-                DEFAULT_TITLE,
-            ),
-            include_names=False,
-        )
-
-        description_parts = self._assemble_attributes(
-            event,
-            self.entry.options.get(
-                CONF_DESCRIPTION,
-                DEFAULT_DESCRIPTION,
-            ),
-            include_names=True,
-        )
-
-        start = event["start"].date() if event["all_day"] else event["start"]
-        end = event["end"].date() if event["all_day"] else event["end"]
-
-        return CalendarEvent(
-            summary=" ".join(title_parts),
-            start=start,
-            end=end,
-            description=", ".join(description_parts),
-            uid=event["id"],
-            location=", ".join(event.get("sites", [])),
-        )
-
-    def _assemble_attributes(
-        self, event: dict[str, Any], attributes: list[str], include_names: bool
-    ) -> list[str]:
-        parts = []
-        for attribute in attributes:
-            if event.get(attribute):
-                if (
-                    type(event[attribute]) == list
-                    and len(event[attribute]) == 1
-                    and attribute in ATTRIBUTES_SINGULAR
-                ):
-                    key = ATTRIBUTES_SINGULAR[attribute]
-                else:
-                    key = attribute
-
-                prefix = (
-                    f"{get_translation(self.translations, key)}: "
-                    if include_names
-                    else ""
-                )
-                if type(event[attribute]) == list:
-                    parts.append(f"{prefix}{', '.join(event[attribute])}")
-                else:
-                    parts.append(f"{prefix}{event[attribute]}")
-
-        if not parts:
-            parts = ["Unknown"]
-
-        return parts
+        return self.coordinator.renderer.render(event, cache)
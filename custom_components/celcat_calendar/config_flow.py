@@ -17,6 +17,7 @@ from celcat_scraper import (
 
 from homeassistant.config_entries import (
     ConfigEntry,
+    ConfigEntryState,
     ConfigFlow,
     ConfigFlowResult,
     OptionsFlowWithConfigEntry,
@@ -40,21 +41,34 @@ from homeassistant.helpers.selector import (
 
 from .const import (
     ATTRIBUTES,
+    CONF_ARCHIVE_YEARS,
     CONF_DESCRIPTION,
     CONF_FILTERS,
+    CONF_FULL_DIAGNOSTICS,
     CONF_GROUP_BY,
+    CONF_NEAR_TERM_DAYS,
+    CONF_NEAR_TERM_SCAN_INTERVAL,
     CONF_REPLACEMENTS,
+    CONF_SHARDED_STORAGE,
     CONF_SHOW_HOLIDAYS,
     CONF_TITLE,
+    DEFAULT_ARCHIVE_YEARS,
     DEFAULT_DESCRIPTION,
     DEFAULT_FILTERS,
+    DEFAULT_FULL_DIAGNOSTICS,
     DEFAULT_GROUP_BY,
     DEFAULT_NAME,
+    DEFAULT_NEAR_TERM_DAYS,
+    DEFAULT_NEAR_TERM_SCAN_INTERVAL,
     DEFAULT_REPLACEMENTS,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SHARDED_STORAGE,
     DEFAULT_SHOW_HOLIDAYS,
     DEFAULT_TITLE,
+    DIAGNOSTICS_OPTIONS,
+    DISPLAY_OPTIONS,
     DOMAIN,
+    FILTER_OPTIONS,
     GROUP_BY_CATEGORY,
     GROUP_BY_CATEGORY_COURSE,
     GROUP_BY_COURSE,
@@ -82,6 +96,12 @@ STEP_REAUTH_DATA_SCHEMA = vol.Schema(
 OPTIONS_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+        vol.Optional(
+            CONF_NEAR_TERM_SCAN_INTERVAL, default=DEFAULT_NEAR_TERM_SCAN_INTERVAL
+        ): vol.All(int, vol.Range(min=1)),
+        vol.Optional(CONF_NEAR_TERM_DAYS, default=DEFAULT_NEAR_TERM_DAYS): vol.All(
+            int, vol.Range(min=0)
+        ),
         vol.Optional(
             CONF_SHOW_HOLIDAYS, default=DEFAULT_SHOW_HOLIDAYS
         ): BooleanSelector(),
@@ -124,6 +144,15 @@ OPTIONS_SCHEMA = vol.Schema(
                 custom_value=True,
             )
         ),
+        vol.Optional(
+            CONF_SHARDED_STORAGE, default=DEFAULT_SHARDED_STORAGE
+        ): BooleanSelector(),
+        vol.Optional(CONF_ARCHIVE_YEARS, default=DEFAULT_ARCHIVE_YEARS): vol.All(
+            int, vol.Range(min=0)
+        ),
+        vol.Optional(
+            CONF_FULL_DIAGNOSTICS, default=DEFAULT_FULL_DIAGNOSTICS
+        ): BooleanSelector(),
     }
 )
 
@@ -330,8 +359,18 @@ class OptionsFlowHandler(OptionsFlowWithConfigEntry):
         """Handle the changes in options."""
         old_options = self.config_entry.options
 
-        if await self._should_reset_data(old_options, user_input):
-            await self._reset_stored_data()
+        if (
+            self.config_entry.state is ConfigEntryState.LOADED
+            and await self._get_changed_options(old_options, user_input)
+            <= DISPLAY_OPTIONS | FILTER_OPTIONS | DIAGNOSTICS_OPTIONS
+        ):
+            _LOGGER.debug("Applying options without reloading")
+            self.hass.config_entries.async_update_entry(
+                self.config_entry, options=user_input
+            )
+            coordinator = self.config_entry.runtime_data.coordinator
+            await coordinator.async_update_options()
+            return
 
         if await self._should_reorganize_entities(old_options, user_input):
             await self._reorganize_calendar_entities()
@@ -344,35 +383,22 @@ class OptionsFlowHandler(OptionsFlowWithConfigEntry):
             self.hass.config_entries.async_reload(self.config_entry.entry_id)
         )
 
-    async def _should_reset_data(
+    async def _get_changed_options(
         self, old_options: dict[str, Any], new_options: dict[str, Any]
-    ) -> bool:
-        """Determine if stored data should be reset."""
-        old_filters = old_options.get(CONF_FILTERS, DEFAULT_FILTERS)
-        new_filters = new_options.get(CONF_FILTERS, DEFAULT_FILTERS)
-
-        for old_filter in old_filters:
-            if old_filter not in new_filters:
-                _LOGGER.info("A data filter has been removed, resetting stored data")
-                return True
-
-        if (
-            FilterType.COURSE_GROUP_SIMILAR.value in old_filters
-            and FilterType.COURSE_STRIP_REDUNDANT.value not in old_filters
-            and FilterType.COURSE_STRIP_REDUNDANT.value in new_filters
-        ):
-            _LOGGER.info(
-                "Strip redundant filter was added after grouping filter. "
-                "Resetting stored data to find strips"
-            )
-            return True
-
-        return False
-
-    async def _reset_stored_data(self) -> None:
-        """Reset the stored data."""
-        store = self.config_entry.runtime_data.store
-        await store.async_save([])
+    ) -> set[str]:
+        """Return the options whose value changed."""
+        changed_options = set()
+
+        for option in OPTIONS_SCHEMA.schema:
+            default = option.default()
+            old_value = old_options.get(option.schema, default)
+            new_value = new_options.get(option.schema, default)
+            if isinstance(default, set):
+                old_value, new_value = set(old_value), set(new_value)
+            if old_value != new_value:
+                changed_options.add(option.schema)
+
+        return changed_options
 
     async def _should_reorganize_entities(
         self, old_options: dict[str, Any], new_options: dict[str, Any]
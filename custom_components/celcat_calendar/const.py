@@ -8,6 +8,11 @@ CONF_DESCRIPTION = "description"
 CONF_GROUP_BY = "group_by"
 CONF_FILTERS = "filters"
 CONF_REPLACEMENTS = "replacements"
+CONF_SHARDED_STORAGE = "sharded_storage"
+CONF_NEAR_TERM_SCAN_INTERVAL = "near_term_scan_interval"
+CONF_NEAR_TERM_DAYS = "near_term_days"
+CONF_ARCHIVE_YEARS = "archive_years"
+CONF_FULL_DIAGNOSTICS = "full_diagnostics"
 
 ATTRIBUTE_ID = "id"
 ATTRIBUTE_CATEGORY = "category"
@@ -45,8 +50,30 @@ GROUP_BY_CATEGORY_COURSE = "category_course"
 
 REMEMBERED_STRIPS = "remembered_strips"
 
+# Options which only change how events are shown, applied without reloading
+DISPLAY_OPTIONS = {CONF_TITLE, CONF_DESCRIPTION, CONF_GROUP_BY}
+
+# Options which only change how raw events are filtered, applied without
+# fetching them again
+FILTER_OPTIONS = {CONF_FILTERS, CONF_REPLACEMENTS}
+
+# Options only read when diagnostics are downloaded
+DIAGNOSTICS_OPTIONS = {CONF_FULL_DIAGNOSTICS}
+
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+ATTR_TRACE_MEMORY = "trace_memory"
+ATTR_SORT = "sort"
+PROFILE_SORTS = ["cumulative", "tottime", "calls"]
+
+# Sent with the entry id after each refresh, even when the events did not change
+SIGNAL_REFRESH_FINISHED = f"{DOMAIN}_refresh_finished_{{}}"
+
 DEFAULT_NAME = "Celcat Calendar"
 DEFAULT_SCAN_INTERVAL = 12
+DEFAULT_NEAR_TERM_SCAN_INTERVAL = 60
+DEFAULT_NEAR_TERM_DAYS = 7
+DEFAULT_ARCHIVE_YEARS = 2
+DEFAULT_FULL_DIAGNOSTICS = False
 DEFAULT_SHOW_HOLIDAYS = False
 DEFAULT_TITLE = [
     ATTRIBUTE_CATEGORY,
@@ -70,3 +97,4 @@ DEFAULT_FILTERS = {
     "sites_remove_duplicates",
 }
 DEFAULT_REPLACEMENTS = []
+DEFAULT_SHARDED_STORAGE = False
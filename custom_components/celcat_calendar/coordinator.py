@@ -2,23 +2,33 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import deque
+from collections.abc import Coroutine
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from itertools import chain
 from typing import Any
 
-import async_timeout
+from aiohttp import ClientSession
+from yarl import URL
 
 from celcat_scraper import (
     CelcatCannotConnectError,
+    CelcatFilterConfig,
     CelcatInvalidAuthError,
     CelcatScraperAsync,
+    FilterType,
 )
+from celcat_scraper.filter import CelcatFilter
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, CONF_SCAN_INTERVAL
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.json import json_bytes_sorted
 from homeassistant.helpers.translation import async_get_translations
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
@@ -26,22 +36,42 @@ from homeassistant.helpers.update_coordinator import (
 )
 from homeassistant.util import dt as dt_util
 
+from .archive import CelcatArchive, get_academic_year, get_academic_year_start
 from .const import (
+    CONF_ARCHIVE_YEARS,
+    CONF_FILTERS,
     CONF_GROUP_BY,
+    CONF_NEAR_TERM_DAYS,
+    CONF_NEAR_TERM_SCAN_INTERVAL,
+    CONF_REPLACEMENTS,
+    DEFAULT_ARCHIVE_YEARS,
+    DEFAULT_FILTERS,
     DEFAULT_GROUP_BY,
+    DEFAULT_NEAR_TERM_DAYS,
+    DEFAULT_NEAR_TERM_SCAN_INTERVAL,
+    DEFAULT_REPLACEMENTS,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     GROUP_BY_CATEGORY,
     GROUP_BY_CATEGORY_COURSE,
     GROUP_BY_COURSE,
     GROUP_BY_OFF,
-    REMEMBERED_STRIPS,
+    SIGNAL_REFRESH_FINISHED,
 )
-from .store import CelcatStore
-from .util import get_translation
+from .diff import CelcatEventsDiff, diff_events, fingerprint_bytes, fingerprint_data
+from .index import CelcatEventIndex
+from .model import CelcatEvent
+from .render import CelcatEventRenderer, get_render_fingerprint
+from .stats import REFRESH_STATS_SIZE, CelcatRefreshStats, time_phase
+from .store import CelcatEventStore
+from .util import as_wall_clock, get_translation, list_to_dict
 
 _LOGGER = logging.getLogger(__name__)
 
+FETCH_CONCURRENCY = 4
+FETCH_CHUNK_ATTEMPTS = 3
+CACHED_UPCOMING_DAYS = 7
+
 
 type CelcatConfigEntry = ConfigEntry[CelcatData]
 
@@ -50,87 +80,774 @@ class CelcatDataUpdateCoordinator(DataUpdateCoordinator[list[dict]]):
     """Class to manage fetching data from Celcat Calendar."""
 
     def __init__(self, hass: HomeAssistant, entry: CelcatConfigEntry) -> None:
-        """Initialize."""
+        """Initialize.
+
+        Refreshes only fetch the next few days, at the near-term interval, and
+        the rest of the year is fetched again at the scan interval.
+        """
+        full_refresh_interval = timedelta(
+            hours=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        )
+        near_term_days = entry.options.get(CONF_NEAR_TERM_DAYS, DEFAULT_NEAR_TERM_DAYS)
+        if near_term_days > 0:
+            update_interval = min(
+                timedelta(
+                    minutes=entry.options.get(
+                        CONF_NEAR_TERM_SCAN_INTERVAL, DEFAULT_NEAR_TERM_SCAN_INTERVAL
+                    )
+                ),
+                full_refresh_interval,
+            )
+        else:
+            update_interval = full_refresh_interval
+
         super().__init__(
             hass,
             _LOGGER,
             name=entry.data[CONF_NAME],
-            update_interval=timedelta(
-                hours=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-            ),
+            update_interval=update_interval,
             update_method=self._async_update_data,
             always_update=False,
         )
         data = entry.runtime_data
         self.hass = hass
         self.celcat: CelcatScraperAsync = data.client
-        self.store: CelcatStore = data.store
+        self.store: CelcatEventStore = data.store
         self.options = entry.options
         self.entry = entry
+        self.indexes: dict[str, CelcatEventIndex] = {}
+        self.renderer: CelcatEventRenderer | None = None
+        self.changed_groups: set[str] = set()
+        self._hashes: dict[str, int] = {}
+        self._groups: dict[str, dict[str, CelcatEvent]] = {"all": {}}
+        self._event_groups: dict[str, str] = {}
+        self._auth: dict[str, Any] | None = None
+        self._near_term_days = near_term_days
+        self._full_refresh_interval = full_refresh_interval
+        self._last_full_refresh: datetime | None = None
+        self._fingerprints: dict[str, str] | None = None
+        self.filter: CelcatFilter | None = None
+        self._filter_applied = False
+        self._remembered_strips: list[str] = []
+        self._raw_hashes: dict[str, int] | None = None
+        self._process_lock = asyncio.Lock()
+        self.archive = CelcatArchive(
+            hass,
+            self.store,
+            entry.options.get(CONF_ARCHIVE_YEARS, DEFAULT_ARCHIVE_YEARS),
+        )
+        self.refresh_stats: deque[CelcatRefreshStats] = deque(maxlen=REFRESH_STATS_SIZE)
+        self._refresh_lock = asyncio.Lock()
+
+        # The raw data of a week fetched to fingerprint it is handed to the
+        # scraper, so that each week is only requested once
+        self._fetched_raw_data: dict[tuple[date, date], list[dict[str, Any]]] = {}
+        self._get_calendar_raw_data = self.celcat.api.get_calendar_raw_data
+        self.celcat.api.get_calendar_raw_data = self._async_get_calendar_raw_data
 
     async def _async_update_data(self) -> list[dict]:
-        """Update data via library."""
+        """Update data via library.
+
+        Refreshes run one at a time, so that overlapping refreshes neither
+        fetch Celcat twice nor mix up their statistics.
+        """
+        async with self._refresh_lock:
+            return await self._async_refresh_data()
+
+    async def _async_refresh_data(self) -> list[dict]:
+        """Refresh the data, and record the statistics of the refresh."""
+        stats = CelcatRefreshStats(dt_util.utcnow())
+        requests = self._get_request_count()
         try:
-            return await self._fetch_data()
+            data = await self._fetch_data(stats)
         except CelcatInvalidAuthError as err:
             raise ConfigEntryAuthFailed from err
         except CelcatCannotConnectError as err:
             raise UpdateFailed(f"Error communicating with API: {err}") from err
         except Exception as err:
             raise UpdateFailed(f"Unexpected error: {err}") from err
+        else:
+            stats.success = True
+            return data
+        finally:
+            stats.finish(self._get_request_count() - requests)
+            self.refresh_stats.append(stats)
+            _LOGGER.debug("Calendar %s: %s", self.name, stats)
+            async_dispatcher_send(
+                self.hass, SIGNAL_REFRESH_FINISHED.format(self.entry.entry_id)
+            )
 
-    async def _fetch_data(self) -> list[dict]:
-        """Fetch data from API and store."""
-        _LOGGER.debug("Updating calendar data")
+    def _get_request_count(self) -> int:
+        """Return the number of requests made to Celcat so far.
+
+        Requests are counted by the rate limiter of the server pool.
+        """
+        return getattr(self.celcat.api.rate_limiter, "requests", 0)
+
+    async def async_load_cached_data(self) -> bool:
+        """Fill the data with the upcoming events of the local store.
+
+        Only the upcoming period is loaded, so that the calendars are served
+        without parsing the whole store. The other events are loaded by
+        async_refresh_cached_data. Returns whether the store had events.
+        """
+        if not await self.store.async_has_events():
+            return False
 
         today = dt_util.now().date()
-        end_year = today.year + (1 if today.month >= 9 else 0)
-        end = date(year=end_year, month=8, day=31)
-
-        async with async_timeout.timeout(180):
-            # Load existing data from the local store
-            local_data = await self.store.async_load()
-            if local_data:
-                for event in local_data:
-                    if isinstance(event["start"], str):
-                        event["start"] = datetime.fromisoformat(event["start"])
-                    if isinstance(event["end"], str):
-                        event["end"] = datetime.fromisoformat(event["end"])
-
-                # Fetch future events
-                start = today
-            else:
-                # Fetch past and future events
-                start = date(end_year - 1, 9, 1)
+        upcoming_days = max(self._near_term_days, CACHED_UPCOMING_DAYS)
+        events = await self.store.async_load_range(
+            today, today + timedelta(days=upcoming_days)
+        )
 
-            events = await self.celcat.get_calendar_events(
-                start=start,
-                end=end,
-                previous_events=local_data,
+        await self._async_update_renderer()
+        diff, self._hashes = diff_events({}, events)
+        self.data = await self._async_apply_diff(diff)
+        _LOGGER.debug("Loaded %s cached upcoming events", len(events))
+        return True
+
+    async def async_refresh_cached_data(self) -> None:
+        """Load the other events of the local store, then refresh them."""
+        async with self._process_lock:
+            events = await self.store.async_load()
+            diff, self._hashes = diff_events(self._hashes, events)
+            if diff:
+                self.data = await self._async_apply_diff(diff)
+                self.async_update_listeners()
+            _LOGGER.debug("Loaded %s cached events", len(events))
+
+        await self.async_refresh()
+
+    async def _fetch_data(self, stats: CelcatRefreshStats) -> list[dict]:
+        """Fetch data from API and store."""
+        _LOGGER.debug("Updating calendar data")
+        self.changed_groups = set()
+
+        now = dt_util.now()
+        today = now.date()
+        year = get_academic_year(today)
+        end = get_academic_year_start(year + 1) - timedelta(days=1)
+
+        with stats.phase("store_load"):
+            await self._async_update_filter()
+
+            # Load the existing raw events from the local store
+            raw_data = await self._async_load_raw()
+        if raw_data is None:
+            await self._async_archive_stored_events(stats, year)
+        full_refresh = (
+            self._near_term_days <= 0
+            or self._last_full_refresh is None
+            or now - self._last_full_refresh >= self._full_refresh_interval
+        )
+        if not raw_data:
+            # Fetch past and future events
+            start = get_academic_year_start(year)
+            full_refresh = True
+        elif full_refresh:
+            # Fetch future events
+            start = today
+        else:
+            # Fetch near-term events, the others are kept from the store
+            start = today
+            end = min(end, today + timedelta(days=self._near_term_days))
+        stats.full = full_refresh
+
+        with stats.phase("store_load"):
+            # Fingerprints are only valid for the stored raw events
+            fingerprints = await self._async_load_fingerprints() if raw_data else {}
+
+        with stats.phase("fetch"):
+            fetched_events, complete = await self._async_get_calendar_events(
+                start, end, raw_data or [], fingerprints, stats
+            )
+        with stats.phase("parse"):
+            raw_events = [CelcatEvent.from_event(event) for event in fetched_events]
+        stats.events_fetched = len(raw_events)
+
+        if full_refresh and complete:
+            self._last_full_refresh = now
+        with stats.phase("store_save"):
+            await self._async_save_auth()
+
+        async with self._process_lock:
+            raw_events = await self._async_archive_events(raw_events, year, stats)
+            with stats.phase("diff"):
+                raw_diff, raw_hashes = diff_events(self._raw_hashes or {}, raw_events)
+            with stats.phase("store_save"):
+                if raw_diff:
+                    await self.store.async_save_raw(raw_events)
+                    self._raw_hashes = raw_hashes
+                # Fingerprints are only valid once their raw events are saved
+                await self._async_save_fingerprints(fingerprints, today)
+            if not raw_diff and self._filter_applied and self.data is not None:
+                _LOGGER.debug("No changes in calendar data")
+                return self.data
+
+            return await self._async_process_events(raw_events, stats)
+
+    async def _async_archive_events(
+        self, raw_events: list[CelcatEvent], year: int, stats: CelcatRefreshStats
+    ) -> list[CelcatEvent]:
+        """Move the events of finished academic years to the archive.
+
+        Archived events are filtered once and for all, so that past years are
+        neither kept in memory nor passed to the scraper at every refresh.
+        Returns the events of the current academic year.
+        """
+        year_start = datetime.combine(get_academic_year_start(year), time.min)
+        past_events = [event for event in raw_events if event.end < year_start]
+        if not past_events:
+            return raw_events
+
+        with stats.phase("archive"):
+            events = await self.hass.async_add_executor_job(
+                _filter_events, self.filter, past_events
             )
+            await self.archive.async_add(events)
+        _LOGGER.debug("Archived %s events of past academic years", len(past_events))
+
+        return [event for event in raw_events if event.end >= year_start]
+
+    async def _async_archive_stored_events(
+        self, stats: CelcatRefreshStats, year: int
+    ) -> None:
+        """Archive the past events of a store kept before raw events were.
+
+        Such stores kept the events of past academic years with the calendar
+        events, while only the current academic year is fetched when there are
+        no raw events. They are already filtered, and would otherwise be
+        removed by the first refresh.
+        """
+        year_start = datetime.combine(get_academic_year_start(year), time.min)
+        async with self._process_lock:
+            with stats.phase("store_load"):
+                events = await self.store.async_load()
+            past_events = [event for event in events if event.end < year_start]
+            if not past_events:
+                return
+
+            with stats.phase("archive"):
+                await self.archive.async_add(past_events)
+        _LOGGER.debug(
+            "Archived %s stored events of past academic years", len(past_events)
+        )
 
-            await self.celcat.close()
+    async def async_get_archived_events(
+        self, group: str, start: datetime, end: datetime
+    ) -> list[CelcatEvent]:
+        """Return the archived events of a group overlapping a range.
+
+        The archive is only loaded for ranges starting before the current
+        academic year.
+        """
+        year_start = get_academic_year_start(get_academic_year(dt_util.now().date()))
+        start = as_wall_clock(start)
+        if start.date() >= year_start:
+            return []
+
+        events = await self.archive.async_get_events(start, as_wall_clock(end))
+        if group != "all":
+            events = (await self._group_events(events)).get(group, [])
+        return events
+
+    async def async_has_archived_events(self, group: str) -> bool:
+        """Return whether a group has archived events, loading the archive."""
+        events = await self.archive.async_get_all_events()
+        return bool((await self._group_events(events)).get(group))
+
+    async def _async_load_raw(self) -> list[CelcatEvent] | None:
+        """Load the stored raw events, and their content hashes once."""
+        raw_data = await self.store.async_load_raw()
+        if raw_data is not None and self._raw_hashes is None:
+            _, self._raw_hashes = diff_events({}, raw_data)
+        return raw_data
+
+    async def _async_process_events(
+        self, raw_events: list[CelcatEvent], stats: CelcatRefreshStats | None = None
+    ) -> dict[str, list[CelcatEvent]]:
+        """Filter the raw events and apply the changes to the groups.
+
+        Filtering runs in the executor, on copies of the raw events, so that
+        they can be filtered again when the filter options change.
+        """
+        with time_phase(stats, "filter"):
+            events = await self.hass.async_add_executor_job(
+                _filter_events, self.filter, raw_events
+            )
+        self._filter_applied = True
+        with time_phase(stats, "store_save"):
             await self._save_remembered_strips(
-                self.celcat.config.filter_config.course_remembered_strips
+                self.filter.config.course_remembered_strips
             )
-            await self.store.async_save(events)
 
-            tz_events = [
-                {
-                    **event,
-                    "start": dt_util.as_local(event["start"]),
-                    "end": dt_util.as_local(event["end"]),
-                }
-                for event in events
+        with time_phase(stats, "diff"):
+            diff, hashes = diff_events(self._hashes, events)
+        if stats is not None:
+            stats.events_changed = len(diff.changed_ids)
+        if not diff and self.data is not None:
+            _LOGGER.debug("No changes in calendar data")
+            return self.data
+
+        await self._async_update_renderer()
+        grouped_events = await self._async_apply_diff(diff, stats)
+        self._hashes = hashes
+
+        with time_phase(stats, "store_save"):
+            # Unchanged events are kept from the previous data, so that the
+            # store shares the same objects instead of the filtered copies
+            await self.store.async_save(grouped_events["all"])
+
+        return grouped_events
+
+    async def _async_update_filter(self) -> bool:
+        """Build the filter from the options if they changed.
+
+        Course strips are remembered as long as the filters don't change.
+        Returns whether the filter changed.
+        """
+        filter_types = set()
+        for filter_string in self.options.get(CONF_FILTERS, DEFAULT_FILTERS):
+            try:
+                filter_types.add(FilterType(filter_string))
+            except ValueError:
+                _LOGGER.warning("Ignoring invalid filter: %s", filter_string)
+        replacements = await list_to_dict(
+            self.options.get(CONF_REPLACEMENTS, DEFAULT_REPLACEMENTS)
+        )
+
+        if self.filter is None:
+            self._remembered_strips = list(
+                await self.store.async_load_remembered_strips() or []
+            )
+            remembered_strips = self._remembered_strips
+        elif (
+            filter_types == self.filter.config.filters
+            and replacements == self.filter.config.course_replacements
+        ):
+            return False
+        elif filter_types == self.filter.config.filters:
+            remembered_strips = self.filter.config.course_remembered_strips
+        else:
+            remembered_strips = []
+
+        self.filter = CelcatFilter(
+            CelcatFilterConfig(
+                filters=filter_types,
+                course_remembered_strips=list(remembered_strips),
+                course_replacements=replacements,
+            )
+        )
+        self._filter_applied = False
+        return True
+
+    async def _async_get_calendar_events(
+        self,
+        start: date,
+        end: date,
+        previous_events: list[CelcatEvent],
+        fingerprints: dict[str, str],
+        stats: CelcatRefreshStats,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """Get events from Celcat, logging in again if the session was rejected.
+
+        Returns the events and whether all of them could be fetched.
+        """
+        reused_session = self.celcat.logged_in
+        try:
+            return await self._async_fetch_chunks(
+                start, end, previous_events, fingerprints, stats
+            )
+        except (CelcatCannotConnectError, CelcatInvalidAuthError) as err:
+            if not reused_session:
+                raise
+            _LOGGER.debug("Celcat session was rejected, logging in again: %s", err)
+
+        self.celcat.logged_in = False
+        return await self._async_fetch_chunks(
+            start, end, previous_events, fingerprints, stats
+        )
+
+    async def _async_fetch_chunks(
+        self,
+        start: date,
+        end: date,
+        previous_events: list[CelcatEvent],
+        fingerprints: dict[str, str],
+        stats: CelcatRefreshStats,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """Fetch a date range from Celcat, one week at a time.
+
+        Weeks are fetched concurrently and retried on their own. A week which
+        still fails keeps its previous events, except for the first one.
+        Weeks whose raw data has the same fingerprint as before keep their
+        previous events too, and the fingerprints are updated in place.
+        """
+        if not self.celcat.logged_in:
+            await self.celcat.login()
+
+        chunks: list[tuple[date, date]] = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(
+                chunk_start + timedelta(days=6 - chunk_start.weekday()), end
+            )
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        def fetch_chunk(
+            chunk_start: date, chunk_end: date
+        ) -> Coroutine[Any, Any, tuple[list[dict[str, Any]], bool]]:
+            return self._async_fetch_chunk(
+                semaphore,
+                chunk_start,
+                chunk_end,
+                self._get_range_events(previous_events, chunk_start, chunk_end),
+                fingerprints,
+                stats,
+            )
+
+        # The first week is fetched alone, so that a rejected session fails
+        # at once instead of in every week
+        results: list[Any] = [await fetch_chunk(*chunks[0])]
+        results.extend(
+            await asyncio.gather(
+                *(fetch_chunk(*chunk) for chunk in chunks[1:]),
+                return_exceptions=True,
+            )
+        )
+
+        events: dict[str, dict[str, Any]] = {}
+        errors: list[Exception] = []
+        processed = 0
+        for (chunk_start, chunk_end), result in zip(chunks, results, strict=True):
+            if isinstance(result, CelcatInvalidAuthError):
+                raise result
+            if isinstance(result, Exception):
+                errors.append(result)
+                chunk_events = self._get_range_events(
+                    previous_events, chunk_start, chunk_end
+                )
+            else:
+                chunk_events, chunk_processed = result
+                processed += chunk_processed
+
+            # Events overlapping two weeks are returned for both
+            for event in chunk_events:
+                events.setdefault(event["id"], event)
+
+        if errors:
+            _LOGGER.warning(
+                "Could not fetch %s of %s weeks, keeping their previous events: %s",
+                len(errors),
+                len(chunks),
+                errors[0],
+            )
+
+        merged_events = list(events.values())
+        merged_events.extend(
+            self._get_range_events(previous_events, start, end, inside=False)
+        )
+
+        _LOGGER.debug(
+            "Processed %s of %s weeks, the others did not change",
+            processed,
+            len(chunks) - len(errors),
+        )
+        stats.weeks = len(chunks)
+        stats.processed_weeks = processed
+
+        return merged_events, not errors
+
+    async def _async_fetch_chunk(
+        self,
+        semaphore: asyncio.Semaphore,
+        start: date,
+        end: date,
+        previous_events: list[CelcatEvent],
+        fingerprints: dict[str, str],
+        stats: CelcatRefreshStats,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """Fetch one chunk of a date range, retrying it on failure.
+
+        Returns the events of the chunk, and whether they were processed by the
+        scraper or kept because the raw data of the chunk did not change.
+        """
+        key = f"{start.isoformat()}/{end.isoformat()}"
+
+        async def fetch() -> tuple[list[dict[str, Any]], bool]:
+            # Each request has its own timeout in the scraper, which starts once
+            # the server budget granted it, so waiting for the budget of a busy
+            # server is not limited
+            raw_events = await self._get_calendar_raw_data(
+                self.celcat.session,
+                self.celcat.config.url,
+                self.celcat.federation_ids,
+                start,
+                end,
+            )
+            payload = json_bytes_sorted(raw_events)
+            stats.payload_bytes += len(payload)
+            fingerprint = fingerprint_bytes(payload)
+            if fingerprints.get(key) == fingerprint:
+                return previous_events, False
+
+            # The scraper sorts the raw data it is given
+            self._fetched_raw_data[start, end] = list(raw_events)
+            try:
+                events = await self.celcat.get_calendar_events(
+                    start=start, end=end, previous_events=previous_events
+                )
+            finally:
+                self._fetched_raw_data.pop((start, end), None)
+
+            # Events which could not be processed are missing, so the chunk
+            # must be processed again next time
+            shown_events = [
+                raw_event
+                for raw_event in raw_events
+                if self.celcat.config.include_holidays or not raw_event["allDay"]
             ]
+            if len(events) >= len(shown_events):
+                fingerprints[key] = fingerprint
+            else:
+                fingerprints.pop(key, None)
+            return events, True
+
+        async with semaphore:
+            for _ in range(FETCH_CHUNK_ATTEMPTS - 1):
+                try:
+                    return await fetch()
+                except (CelcatCannotConnectError, TimeoutError) as err:
+                    _LOGGER.debug("Retrying events from %s to %s: %s", start, end, err)
+            return await fetch()
+
+    async def _async_get_calendar_raw_data(
+        self,
+        session: ClientSession,
+        url: str,
+        federation_ids: str,
+        start_date: date,
+        end_date: date,
+    ) -> list[dict[str, Any]]:
+        """Return the raw data of a week which was already fetched, if any."""
+        if (
+            raw_data := self._fetched_raw_data.pop((start_date, end_date), None)
+        ) is not None:
+            return raw_data
+        return await self._get_calendar_raw_data(
+            session, url, federation_ids, start_date, end_date
+        )
+
+    def _is_shown(self, event: CelcatEvent) -> bool:
+        """Return whether the scraper keeps a previous event."""
+        return self.celcat.config.include_holidays or not event.all_day
+
+    def _get_range_events(
+        self, events: list[CelcatEvent], start: date, end: date, inside: bool = True
+    ) -> list[CelcatEvent]:
+        """Return the shown events overlapping a date range, or outside it."""
+        start_datetime = datetime.combine(start, time.min)
+        end_datetime = datetime.combine(end, time.max)
+        return [
+            event
+            for event in events
+            if self._is_shown(event)
+            and (event.end >= start_datetime and event.start <= end_datetime) == inside
+        ]
+
+    def _get_processing_fingerprint(self) -> str:
+        """Return a fingerprint of the options used to process raw events.
+
+        Filters are applied afterwards, so they don't invalidate the weeks.
+        """
+        return fingerprint_data(
+            {"include_holidays": self.celcat.config.include_holidays}
+        )
+
+    async def _async_load_fingerprints(self) -> dict[str, str]:
+        """Load the fingerprints of the weeks, if the options did not change."""
+        if self._fingerprints is None:
+            stored = await self.store.async_load_fingerprints()
+            if stored and stored["options"] == self._get_processing_fingerprint():
+                self._fingerprints = stored["weeks"]
+            else:
+                self._fingerprints = {}
+        return dict(self._fingerprints)
+
+    async def _async_save_fingerprints(
+        self, fingerprints: dict[str, str], today: date
+    ) -> None:
+        """Save the fingerprints of the weeks which did not end yet."""
+        fingerprints = {
+            key: fingerprint
+            for key, fingerprint in fingerprints.items()
+            if key.partition("/")[2] >= today.isoformat()
+        }
+
+        if fingerprints != self._fingerprints:
+            await self.store.async_save_fingerprints(
+                {"options": self._get_processing_fingerprint(), "weeks": fingerprints}
+            )
+            self._fingerprints = fingerprints
+
+    async def async_restore_auth(self) -> None:
+        """Restore the Celcat session saved by a previous run."""
+        if not (auth := await self.store.async_load_auth()):
+            return
 
-            return await self._group_events(tz_events)
+        self.celcat.session.cookie_jar.update_cookies(
+            auth["cookies"], URL(self.celcat.config.url)
+        )
+        self.celcat.federation_ids = auth["federation_ids"]
+        self.celcat.logged_in = True
+        self._auth = auth
+
+    async def _async_save_auth(self) -> None:
+        """Save the authentication state of the Celcat session if it changed."""
+        cookies = self.celcat.session.cookie_jar.filter_cookies(
+            URL(self.celcat.config.url)
+        )
+        auth = {
+            "federation_ids": self.celcat.federation_ids,
+            "cookies": {name: morsel.value for name, morsel in cookies.items()},
+        }
+
+        if auth != self._auth:
+            await self.store.async_save_auth(auth)
+            self._auth = auth
+
+    async def _async_apply_diff(
+        self, diff: CelcatEventsDiff, stats: CelcatRefreshStats | None = None
+    ) -> dict[str, list[CelcatEvent]]:
+        """Update groups, indexes and rendered events from a diff.
+
+        Events stay naive, in local wall clock time, so that they are shared
+        with the store. They are only localized when rendered.
+        """
+        changed_groups = {"all"}
+
+        with time_phase(stats, "group"):
+            new_groups = await self._group_events(
+                [*diff.added.values(), *diff.modified.values()]
+            )
+
+            for event_id in chain(diff.removed, diff.modified):
+                del self._groups["all"][event_id]
+                if (group := self._event_groups.pop(event_id, None)) is not None:
+                    del self._groups[group][event_id]
+                    changed_groups.add(group)
+
+            for group, group_events in new_groups.items():
+                changed_groups.add(group)
+                members = self._groups.setdefault(group, {})
+                for event in group_events:
+                    members[event.id] = event
+                    if group != "all":
+                        self._event_groups[event.id] = group
+
+        with time_phase(stats, "index"):
+            grouped_events = dict(self.data or {})
+            for group in [group for group in self._groups if group in changed_groups]:
+                if group == "all" or self._groups[group]:
+                    grouped_events[group] = list(self._groups[group].values())
+                    self.indexes[group] = CelcatEventIndex(grouped_events[group])
+                else:
+                    del self._groups[group]
+                    grouped_events.pop(group, None)
+                    self.indexes.pop(group, None)
+
+        self.renderer.discard(diff.changed_ids)
+        self.changed_groups = changed_groups
+        _LOGGER.debug(
+            "Applied %s added, %s modified and %s removed events to groups %s",
+            len(diff.added),
+            len(diff.modified),
+            len(diff.removed),
+            changed_groups,
+        )
+
+        return grouped_events
+
+    async def async_update_options(self) -> None:
+        """Apply the display and filter options of the entry to the loaded events.
+
+        Changed filters are applied to the stored raw events, without fetching
+        them again.
+        """
+        group_by = self.options.get(CONF_GROUP_BY, DEFAULT_GROUP_BY)
+        self.options = self.entry.options
+
+        await self._async_update_renderer()
+        if self.data is None:
+            return
+
+        data = self.data
+        if await self._async_update_filter():
+            if (raw_data := await self._async_load_raw()) is None:
+                # Events stored before raw events were kept must be fetched
+                await self.async_request_refresh()
+            else:
+                _LOGGER.debug("Filtering %s raw events again", len(raw_data))
+                async with self._process_lock:
+                    data = await self._async_process_events(raw_data)
+
+        if self.options.get(CONF_GROUP_BY, DEFAULT_GROUP_BY) != group_by:
+            data = await self._async_regroup()
+
+        # Titles and descriptions may have changed in every calendar
+        self.changed_groups = set(data)
+        self.data = data
+        self.async_update_listeners()
+
+    async def _async_regroup(self) -> dict[str, list[CelcatEvent]]:
+        """Group the loaded events again, after the grouping option changed."""
+        grouped_events = await self._group_events(list(self._groups["all"].values()))
+
+        self._groups = {
+            group: {event.id: event for event in events}
+            for group, events in grouped_events.items()
+        }
+        self._event_groups = {
+            event.id: group
+            for group, events in grouped_events.items()
+            if group != "all"
+            for event in events
+        }
+        self.indexes = {
+            group: (
+                self.indexes["all"]
+                if group == "all"
+                else CelcatEventIndex(grouped_events[group])
+            )
+            for group in grouped_events
+        }
+        _LOGGER.debug("Regrouped events into %s groups", len(grouped_events))
+
+        return grouped_events
+
+    async def _async_update_renderer(self) -> None:
+        """Build a new renderer if the options or language changed."""
+        fingerprint = get_render_fingerprint(
+            self.entry.options, self.hass.config.language
+        )
+
+        if self.renderer is None or self.renderer.fingerprint != fingerprint:
+            translations = await async_get_translations(
+                self.hass,
+                self.hass.config.language,
+                category="selector",
+                integrations=[DOMAIN],
+            )
+            self.renderer = CelcatEventRenderer(fingerprint, translations)
 
     async def _group_events(
-        self, events: list[dict[str, Any]]
-    ) -> dict[str, list[dict[str, Any]]]:
+        self, events: list[CelcatEvent]
+    ) -> dict[str, list[CelcatEvent]]:
         """Group events by course or category based on configuration."""
-        grouped_events: dict[str, list[dict[str, Any]]] = {"all": events}
+        grouped_events: dict[str, list[CelcatEvent]] = {"all": events}
 
         group_by = self.options.get(CONF_GROUP_BY, DEFAULT_GROUP_BY)
         if group_by == GROUP_BY_OFF:
@@ -144,15 +861,15 @@ class CelcatDataUpdateCoordinator(DataUpdateCoordinator[list[dict]]):
         )
         unknown_title = get_translation(translations, "unknown")
 
-        def get_group_by_course(event: dict[str, Any]) -> str:
-            return event.get("course") or unknown_title
+        def get_group_by_course(event: CelcatEvent) -> str:
+            return event.course or unknown_title
 
-        def get_group_by_category(event: dict[str, Any]) -> str:
-            return event.get("category") or unknown_title
+        def get_group_by_category(event: CelcatEvent) -> str:
+            return event.category or unknown_title
 
-        def get_group_by_category_course(event: dict[str, Any]) -> str:
-            category = event.get("category", "")
-            course = event.get("course", "")
+        def get_group_by_category_course(event: CelcatEvent) -> str:
+            category = event.category
+            course = event.course
 
             if category and course:
                 return f"{category} {course}"
@@ -179,10 +896,40 @@ class CelcatDataUpdateCoordinator(DataUpdateCoordinator[list[dict]]):
         return grouped_events
 
     async def _save_remembered_strips(self, remembered_strips: list[str]) -> None:
-        """Save remembered strips to the config entry."""
-        data = self.entry.data.copy()
-        data[REMEMBERED_STRIPS] = remembered_strips
-        self.hass.config_entries.async_update_entry(self.entry, data=data)
+        """Save remembered strips to the store if they changed."""
+        if remembered_strips != self._remembered_strips:
+            self._remembered_strips = remembered_strips.copy()
+            await self.store.async_save_remembered_strips(self._remembered_strips)
+
+
+def _filter_events(
+    event_filter: CelcatFilter, raw_events: list[CelcatEvent]
+) -> list[CelcatEvent]:
+    """Return filtered copies of raw events, in the executor."""
+    events = [
+        event.copy(
+            rooms=list(event.rooms),
+            professors=list(event.professors),
+            modules=list(event.modules),
+            sites=list(event.sites),
+        )
+        for event in raw_events
+    ]
+
+    # The filter is only asynchronous by its interface, it never waits, so
+    # it is run to completion without an event loop
+    coro = event_filter.filter_events(events)
+    try:
+        coro.send(None)
+    except StopIteration:
+        pass
+    else:
+        coro.close()
+        raise RuntimeError("Filtering events unexpectedly waited")
+
+    for event in events:
+        event.intern()
+    return events
 
 
 @dataclass
@@ -190,5 +937,5 @@ class CelcatData:
     """Celcat data class."""
 
     client: CelcatScraperAsync
-    store: CelcatStore
+    store: CelcatEventStore
     coordinator: CelcatDataUpdateCoordinator
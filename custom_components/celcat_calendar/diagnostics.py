@@ -1,38 +1,89 @@
 """Provides diagnostics for Celcat Calendar."""
 
 import datetime
+from collections.abc import Iterable, Sequence
 from typing import Any
 
 from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.core import HomeAssistant
 from homeassistant.util import dt as dt_util
 
-from .coordinator import CelcatConfigEntry
+from .const import CONF_FULL_DIAGNOSTICS, DEFAULT_FULL_DIAGNOSTICS
+from .coordinator import CelcatConfigEntry, CelcatDataUpdateCoordinator
+from .model import CelcatEvent
 
 TO_REDACT = {"id", "rooms", "professors", "modules", "department", "sites"}
+SAMPLE_SIZE = 20
 
 
-def redact_store(data: dict[str, Any]) -> dict[str, Any]:
+def redact_store(events: Iterable[CelcatEvent]) -> list[dict[str, Any]]:
     """Redact personal information from calendar events in the store."""
-    diagnostics = []
-    for event in data:
-        diagnostics.append(
-            async_redact_data(event, TO_REDACT),
-        )
-    return diagnostics
+    return [async_redact_data(event, TO_REDACT) for event in events]
+
+
+def sample_events(events: Sequence[CelcatEvent]) -> list[CelcatEvent]:
+    """Return events spread evenly over the store, at most SAMPLE_SIZE."""
+    step = max(1, len(events) // SAMPLE_SIZE)
+    return list(events[::step][:SAMPLE_SIZE])
+
+
+def _get_summary(
+    coordinator: CelcatDataUpdateCoordinator, events: Sequence[CelcatEvent]
+) -> dict[str, Any]:
+    """Return statistics about the events of an entry."""
+    summary: dict[str, Any] = {
+        "events": len(events),
+        "groups": {
+            group: len(group_events)
+            for group, group_events in (coordinator.data or {}).items()
+        },
+        "first_start": None,
+        "last_end": None,
+        "archive_retained_years": coordinator.archive.retained_years,
+    }
+    if events:
+        summary["first_start"] = min(event.start for event in events).isoformat()
+        summary["last_end"] = max(event.end for event in events).isoformat()
+
+    if (event_filter := coordinator.filter) is not None:
+        summary["filter"] = {
+            "filters": sorted(
+                filter_type.value for filter_type in event_filter.config.filters
+            ),
+            "course_replacements": len(event_filter.config.course_replacements),
+            "course_remembered_strips": len(
+                event_filter.config.course_remembered_strips
+            ),
+        }
+    return summary
 
 
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: CelcatConfigEntry
 ) -> dict[str, Any]:
-    """Return diagnostics for a config entry."""
+    """Return diagnostics for a config entry.
+
+    Only statistics and a small redacted sample of the events are returned,
+    unless the full dump is enabled in the options.
+    """
     payload: dict[str, Any] = {
         "now": dt_util.now().isoformat(),
         "timezone": str(dt_util.get_default_time_zone()),
         "system_timezone": str(datetime.datetime.now().astimezone().tzinfo),
     }
 
+    coordinator = entry.runtime_data.coordinator
+    payload["refreshes"] = [stats.as_dict() for stats in coordinator.refresh_stats]
+
     store = entry.runtime_data.store
-    data = await store.async_load()
-    payload["store"] = redact_store(data)
+    events = await store.async_load() or []
+    payload["summary"] = _get_summary(coordinator, events)
+    payload["summary"]["store_size"] = await hass.async_add_executor_job(
+        store.get_disk_size
+    )
+
+    if entry.options.get(CONF_FULL_DIAGNOSTICS, DEFAULT_FULL_DIAGNOSTICS):
+        payload["store"] = await hass.async_add_executor_job(redact_store, events)
+    else:
+        payload["sample"] = redact_store(sample_events(events))
     return payload
@@ -0,0 +1,74 @@
+"""Event list diffing for Celcat Calendar."""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.helpers.json import json_bytes_sorted
+
+from .model import CelcatEvent
+
+
+@dataclass
+class CelcatEventsDiff:
+    """Changes between two versions of the event list, by event id."""
+
+    added: dict[str, CelcatEvent] = field(default_factory=dict)
+    modified: dict[str, CelcatEvent] = field(default_factory=dict)
+    removed: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        """Return whether anything changed."""
+        return bool(self.added or self.modified or self.removed)
+
+    @property
+    def changed_ids(self) -> set[str]:
+        """Return the ids of all added, modified and removed events."""
+        return {*self.added, *self.modified, *self.removed}
+
+
+def hash_event(event: CelcatEvent) -> int:
+    """Return a hash of the content of an event."""
+    return hash(
+        tuple(
+            tuple(value) if isinstance(value, list) else value
+            for value in event.values()
+        )
+    )
+
+
+def diff_events(
+    hashes: dict[str, int], events: Iterable[CelcatEvent]
+) -> tuple[CelcatEventsDiff, dict[str, int]]:
+    """Compare events to the previous content hashes.
+
+    Returns the diff and the content hashes of the new events.
+    """
+    diff = CelcatEventsDiff()
+    new_hashes: dict[str, int] = {}
+
+    for event in events:
+        event_id = event["id"]
+        new_hashes[event_id] = event_hash = hash_event(event)
+
+        previous_hash = hashes.get(event_id)
+        if previous_hash is None:
+            diff.added[event_id] = event
+        elif previous_hash != event_hash:
+            diff.modified[event_id] = event
+
+    diff.removed = hashes.keys() - new_hashes.keys()
+    return diff, new_hashes
+
+
+def fingerprint_data(data: Any) -> str:
+    """Return a stable fingerprint of JSON serializable data."""
+    return fingerprint_bytes(json_bytes_sorted(data))
+
+
+def fingerprint_bytes(payload: bytes) -> str:
+    """Return the fingerprint of serialized data."""
+    return hashlib.sha256(payload).hexdigest()
@@ -0,0 +1,94 @@
+"""Sorted event index for Celcat Calendar."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from heapq import merge
+from operator import attrgetter
+
+from .model import CelcatEvent
+
+LONG_EVENT_DURATION = timedelta(days=1)
+
+_get_start = attrgetter("start")
+_get_end = attrgetter("end")
+
+
+class CelcatEventIndex:
+    """Sorted start index over the events of a calendar group.
+
+    Events are kept sorted by start so range queries only bisect to the
+    candidate window instead of scanning the whole academic year. The
+    window is widened by the longest event duration so that events which
+    started before the range but are still running are found too.
+    Events longer than a day (holidays, internships...) are kept apart so
+    they don't widen the window for every other event.
+
+    The index also keeps a cursor on the next event, which only moves
+    forward once the event it points to has ended. Queries use the same
+    naive local times as the events.
+    """
+
+    def __init__(self, events: Iterable[CelcatEvent]) -> None:
+        """Initialize the index."""
+        short_events: list[CelcatEvent] = []
+        long_events: list[CelcatEvent] = []
+
+        for event in events:
+            if event.end - event.start > LONG_EVENT_DURATION:
+                long_events.append(event)
+            else:
+                short_events.append(event)
+
+        short_events.sort(key=_get_start)
+        long_events.sort(key=_get_start)
+
+        self._events = short_events
+        self._starts = [event.start for event in short_events]
+        self._max_duration = max(
+            (event.end - event.start for event in short_events),
+            default=timedelta(0),
+        )
+        self._long_events = long_events
+
+        by_end = sorted((*short_events, *long_events), key=_get_end)
+        self._ends = [event.end for event in by_end]
+
+        # Earliest starting event among the ones ending at or after each position
+        self._upcoming: list[CelcatEvent] = by_end.copy()
+        for position in range(len(by_end) - 2, -1, -1):
+            following = self._upcoming[position + 1]
+            if following.start < by_end[position].start:
+                self._upcoming[position] = following
+
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        """Return the number of indexed events."""
+        return len(self._events) + len(self._long_events)
+
+    def between(self, start: datetime, end: datetime) -> Iterator[CelcatEvent]:
+        """Yield events overlapping the range, sorted by start."""
+        low = bisect_left(self._starts, start - self._max_duration)
+        high = bisect_right(self._starts, end)
+
+        short_events = (event for event in self._events[low:high] if event.end >= start)
+        long_events = (
+            event
+            for event in self._long_events
+            if event.end >= start and event.start <= end
+        )
+
+        yield from merge(short_events, long_events, key=_get_start)
+
+    def next_event(self, now: datetime) -> CelcatEvent | None:
+        """Return the earliest event which has not ended yet."""
+        cursor = self._cursor
+        if cursor < len(self._ends) and self._ends[cursor] < now:
+            cursor = self._cursor = bisect_left(self._ends, now, cursor)
+
+        if cursor == len(self._ends):
+            return None
+        return self._upcoming[cursor]
@@ -0,0 +1,152 @@
+"""Event model for Celcat Calendar."""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator, Mapping, MutableMapping
+from datetime import datetime
+from typing import Any
+
+EVENT_FIELDS = (
+    "id",
+    "start",
+    "end",
+    "all_day",
+    "category",
+    "course",
+    "rooms",
+    "professors",
+    "modules",
+    "department",
+    "sites",
+    "faculty",
+    "notes",
+)
+_EVENT_FIELDS = frozenset(EVENT_FIELDS)
+
+
+class CelcatEvent(MutableMapping[str, Any]):
+    """A Celcat event.
+
+    Attributes are stored in slots instead of a per-event dict, and string
+    values are interned so that rooms, professors, courses... are shared
+    between events. The event still behaves like the scraper's event dicts,
+    so it can be passed back to it as a previous event and be filtered in
+    place.
+    """
+
+    __slots__ = EVENT_FIELDS
+
+    id: str
+    start: datetime
+    end: datetime
+    all_day: bool
+    category: str
+    course: str
+    rooms: list[str]
+    professors: list[str]
+    modules: list[str]
+    department: str
+    sites: list[str]
+    faculty: str
+    notes: str
+
+    def __init__(
+        self,
+        id: str,
+        start: datetime,
+        end: datetime,
+        all_day: bool,
+        category: str,
+        course: str,
+        rooms: list[str],
+        professors: list[str],
+        modules: list[str],
+        department: str,
+        sites: list[str],
+        faculty: str,
+        notes: str,
+    ) -> None:
+        """Initialize the event."""
+        self.id = id
+        self.start = start
+        self.end = end
+        self.all_day = all_day
+        self.category = category
+        self.course = course
+        self.rooms = rooms
+        self.professors = professors
+        self.modules = modules
+        self.department = department
+        self.sites = sites
+        self.faculty = faculty
+        self.notes = notes
+        self.intern()
+
+    @classmethod
+    def from_event(cls, event: Mapping[str, Any]) -> CelcatEvent:
+        """Return a CelcatEvent from an event of the scraper."""
+        if isinstance(event, CelcatEvent):
+            event.intern()
+            return event
+        return cls(**{field: event[field] for field in EVENT_FIELDS})
+
+    def intern(self) -> None:
+        """Intern the strings of the event, which filters may have replaced."""
+        intern = sys.intern
+        self.category = intern(self.category)
+        self.course = intern(self.course)
+        self.rooms = [intern(room) for room in self.rooms]
+        self.professors = [intern(professor) for professor in self.professors]
+        self.modules = [intern(module) for module in self.modules]
+        self.department = intern(self.department)
+        self.sites = [intern(site) for site in self.sites]
+        self.faculty = intern(self.faculty)
+        self.notes = intern(self.notes)
+
+    def copy(self, **changes: Any) -> CelcatEvent:
+        """Return a copy of the event with some attributes changed."""
+        event = object.__new__(CelcatEvent)
+        for field in EVENT_FIELDS:
+            setattr(event, field, changes.get(field, getattr(self, field)))
+        return event
+
+    def values(self) -> list[Any]:  # type: ignore[override]
+        """Return the values of the event, in field order."""
+        return [getattr(self, field) for field in EVENT_FIELDS]
+
+    def __getitem__(self, key: str) -> Any:
+        """Return an attribute of the event."""
+        if key not in _EVENT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Set an attribute of the event."""
+        if key not in _EVENT_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        """Event attributes can't be deleted."""
+        raise TypeError("Event attributes can't be deleted")
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the attribute names."""
+        return iter(EVENT_FIELDS)
+
+    def __len__(self) -> int:
+        """Return the number of attributes."""
+        return len(EVENT_FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the attributes of two events."""
+        if isinstance(other, CelcatEvent):
+            return self.values() == other.values()
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return the representation of the event."""
+        return f"CelcatEvent({dict(zip(EVENT_FIELDS, self.values()))!r})"
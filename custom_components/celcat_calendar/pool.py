@@ -0,0 +1,183 @@
+"""Shared request budget for the Celcat Calendar entries of a same server."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from aiohttp import ClientSession
+
+from celcat_scraper import CelcatConstants, CelcatScraperAsync
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_POOLS = "pools"
+
+RATE_LIMIT = 0.1
+MAX_BACKOFF = 4.0
+
+
+class CelcatRateBudget:
+    """Request budget shared by all the entries of a Celcat server.
+
+    Requests are granted one at a time, spaced by the rate limit, and
+    entries waiting for a request are served in turn so that one entry
+    refreshing a whole year can't starve the others.
+    """
+
+    def __init__(self, hass: HomeAssistant, url: str, rate_limit: float) -> None:
+        """Initialize the budget."""
+        self.hass = hass
+        self.url = url
+        self.delay = rate_limit
+        self._backoff_factor = 1.0
+        self._last_grant = 0.0
+        self._queues: dict[str, deque[asyncio.Future[None]]] = {}
+        self._dispatcher: asyncio.Task[None] | None = None
+
+    async def acquire(self, key: str) -> None:
+        """Wait for the turn of an entry to make a request."""
+        future: asyncio.Future[None] = self.hass.loop.create_future()
+        self._queues.setdefault(key, deque()).append(future)
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = self.hass.async_create_background_task(
+                self._async_dispatch(), f"{DOMAIN} rate budget {self.url}"
+            )
+
+        await future
+
+    async def _async_dispatch(self) -> None:
+        """Grant the queued requests, one entry after the other."""
+        while self._queues:
+            # Take the first entry in line, and move it to the back
+            key = next(iter(self._queues))
+            queue = self._queues.pop(key)
+            future = queue.popleft()
+            if queue:
+                self._queues[key] = queue
+
+            if future.done():
+                continue
+
+            delay = self.delay * self._backoff_factor
+            elapsed = time.monotonic() - self._last_grant
+            if elapsed < delay:
+                await asyncio.sleep(delay - elapsed)
+
+            if not future.done():
+                future.set_result(None)
+                self._last_grant = time.monotonic()
+
+    def increase_backoff(self) -> None:
+        """Slow down all the entries after a failed request."""
+        self._backoff_factor = min(self._backoff_factor * 1.5, MAX_BACKOFF)
+
+    def reset_backoff(self) -> None:
+        """Restore the normal rate after a successful request."""
+        self._backoff_factor = 1.0
+
+    def cancel(self) -> None:
+        """Stop granting requests."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        for queue in self._queues.values():
+            for future in queue:
+                future.cancel()
+        self._queues.clear()
+
+
+class CelcatRateLimiter:
+    """Rate limiter of an entry, drawing from the budget of its server.
+
+    Replaces the rate limiter of the scraper's API, and counts the requests
+    it granted.
+    """
+
+    def __init__(self, budget: CelcatRateBudget, key: str) -> None:
+        """Initialize the rate limiter."""
+        self.budget = budget
+        self.key = key
+        self.requests = 0
+
+    async def acquire(self) -> None:
+        """Wait until the server budget allows the next request."""
+        await self.budget.acquire(self.key)
+        self.requests += 1
+
+    def increase_backoff(self) -> None:
+        """Increase the backoff of the server on failure."""
+        self.budget.increase_backoff()
+
+    def reset_backoff(self) -> None:
+        """Reset the backoff of the server on success."""
+        self.budget.reset_backoff()
+
+
+class CelcatServerPool:
+    """Resources shared by the entries of a Celcat server."""
+
+    def __init__(self, hass: HomeAssistant, url: str) -> None:
+        """Initialize the pool."""
+        self.hass = hass
+        self.url = url
+        self.budget = CelcatRateBudget(hass, url, RATE_LIMIT)
+        self.semaphore = asyncio.Semaphore(CelcatConstants.CONCURRENT_REQUESTS)
+        self.sessions: dict[str, ClientSession] = {}
+
+    def get_session(self, entry_id: str) -> ClientSession:
+        """Return the session of an entry.
+
+        Sessions use Home Assistant's shared connector, so connections to the
+        server are pooled, but each has its own cookie jar for its login.
+        """
+        if entry_id not in self.sessions:
+            self.sessions[entry_id] = async_create_clientsession(
+                self.hass, auto_cleanup=False
+            )
+        return self.sessions[entry_id]
+
+    def attach(self, entry_id: str, celcat: CelcatScraperAsync) -> None:
+        """Make a scraper use the request budget of the server."""
+        celcat.api.rate_limiter = CelcatRateLimiter(self.budget, entry_id)
+        celcat.api.semaphore = self.semaphore
+
+    async def async_release(self, entry_id: str) -> bool:
+        """Release the session of an entry, if it was not released yet.
+
+        Returns whether the pool is no longer used.
+        """
+        if (session := self.sessions.pop(entry_id, None)) is not None:
+            await session.close()
+
+        if self.sessions:
+            return False
+
+        self.budget.cancel()
+        return True
+
+
+def async_get_pool(hass: HomeAssistant, url: str) -> CelcatServerPool:
+    """Return the pool of a Celcat server, creating it if needed."""
+    pools: dict[str, CelcatServerPool] = hass.data[DOMAIN].setdefault(DATA_POOLS, {})
+
+    if url not in pools:
+        _LOGGER.debug("Creating request pool for %s", url)
+        pools[url] = CelcatServerPool(hass, url)
+    return pools[url]
+
+
+async def async_release_pool(hass: HomeAssistant, url: str, entry_id: str) -> None:
+    """Release the pool of a Celcat server for an entry."""
+    pools: dict[str, CelcatServerPool] = hass.data[DOMAIN].get(DATA_POOLS, {})
+
+    if (pool := pools.get(url)) is not None and await pool.async_release(entry_id):
+        _LOGGER.debug("Removing request pool for %s", url)
+        del pools[url]
@@ -0,0 +1,125 @@
+"""Calendar event rendering for Celcat Calendar."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from homeassistant.components.calendar import CalendarEvent
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTRIBUTES_SINGULAR,
+    CONF_DESCRIPTION,
+    CONF_TITLE,
+    DEFAULT_DESCRIPTION,
+    DEFAULT_TITLE,
+)
+from .model import CelcatEvent
+from .util import get_translation
+
+type RenderFingerprint = tuple[str, tuple[str, ...], tuple[str, ...]]
+
+
+def get_render_fingerprint(
+    options: Mapping[str, Any], language: str
+) -> RenderFingerprint:
+    """Return the options and language a renderer depends on."""
+    return (
+        language,
+        tuple(options.get(CONF_TITLE, DEFAULT_TITLE)),
+        tuple(options.get(CONF_DESCRIPTION, DEFAULT_DESCRIPTION)),
+    )
+
+
+class CelcatEventRenderer:
+    """Render Celcat events to calendar events, caching the result by event id.
+
+    Title and description formats are compiled once from the options, so
+    translations are only looked up when the renderer is built.
+    """
+
+    def __init__(
+        self, fingerprint: RenderFingerprint, translations: dict[str, str]
+    ) -> None:
+        """Initialize the renderer."""
+        _, title, description = fingerprint
+        self.fingerprint = fingerprint
+        self._title_fields = self._compile(title, translations, include_names=False)
+        self._description_fields = self._compile(
+            description, translations, include_names=True
+        )
+        self._cache: dict[str, CalendarEvent] = {}
+
+    @staticmethod
+    def _compile(
+        attributes: tuple[str, ...],
+        translations: dict[str, str],
+        include_names: bool,
+    ) -> list[tuple[str, str, str]]:
+        """Return the attribute and its singular and plural prefixes."""
+        if not include_names:
+            return [(attribute, "", "") for attribute in attributes]
+
+        fields = []
+        for attribute in attributes:
+            singular = ATTRIBUTES_SINGULAR.get(attribute, attribute)
+            fields.append(
+                (
+                    attribute,
+                    f"{get_translation(translations, singular)}: ",
+                    f"{get_translation(translations, attribute)}: ",
+                )
+            )
+        return fields
+
+    @staticmethod
+    def _assemble(event: CelcatEvent, fields: list[tuple[str, str, str]]) -> list[str]:
+        """Assemble the parts of an event text."""
+        parts = []
+        for attribute, singular_prefix, plural_prefix in fields:
+            value = getattr(event, attribute)
+            if not value:
+                continue
+
+            if isinstance(value, list):
+                prefix = singular_prefix if len(value) == 1 else plural_prefix
+                parts.append(f"{prefix}{', '.join(value)}")
+            else:
+                parts.append(f"{plural_prefix}{value}")
+
+        if not parts:
+            parts = ["Unknown"]
+
+        return parts
+
+    def render(self, event: CelcatEvent, cache: bool = True) -> CalendarEvent:
+        """Return the CalendarEvent of an API event.
+
+        Events which are rarely shown, like archived ones, can skip the cache.
+        """
+        if cache and (calendar_event := self._cache.get(event.id)) is not None:
+            return calendar_event
+
+        # Events are in local wall clock time, like the dates of Celcat
+        if event.all_day:
+            start, end = event.start.date(), event.end.date()
+        else:
+            start, end = dt_util.as_local(event.start), dt_util.as_local(event.end)
+
+        calendar_event = CalendarEvent(
+            summary=" ".join(self._assemble(event, self._title_fields)),
+            start=start,
+            end=end,
+            description=", ".join(self._assemble(event, self._description_fields)),
+            uid=event.id,
+            location=", ".join(event.sites),
+        )
+        if cache:
+            self._cache[event.id] = calendar_event
+        return calendar_event
+
+    def discard(self, event_ids: Iterable[str]) -> None:
+        """Forget the rendered events with the given ids."""
+        for event_id in event_ids:
+            self._cache.pop(event_id, None)
@@ -0,0 +1,173 @@
+"""Diagnostic sensor platform for Celcat."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from . import CelcatConfigEntry
+from .const import DOMAIN, SIGNAL_REFRESH_FINISHED
+from .coordinator import CelcatDataUpdateCoordinator
+from .stats import CelcatRefreshStats
+
+
+@dataclass(frozen=True, kw_only=True)
+class CelcatSensorEntityDescription(SensorEntityDescription):
+    """Describes a Celcat diagnostic sensor."""
+
+    value_fn: Callable[[CelcatDataUpdateCoordinator], float | int | None]
+
+
+def _last_stats(
+    value_fn: Callable[[CelcatRefreshStats], float | int | None],
+) -> Callable[[CelcatDataUpdateCoordinator], float | int | None]:
+    """Return a value of the statistics of the last refresh, if any."""
+
+    def get_value(coordinator: CelcatDataUpdateCoordinator) -> float | int | None:
+        if not coordinator.refresh_stats:
+            return None
+        return value_fn(coordinator.refresh_stats[-1])
+
+    return get_value
+
+
+SENSORS: tuple[CelcatSensorEntityDescription, ...] = (
+    CelcatSensorEntityDescription(
+        key="refresh_duration",
+        translation_key="refresh_duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=2,
+        value_fn=_last_stats(lambda stats: stats.duration),
+    ),
+    CelcatSensorEntityDescription(
+        key="network_time",
+        translation_key="network_time",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=2,
+        value_fn=_last_stats(lambda stats: stats.phases.get("fetch", 0.0)),
+    ),
+    CelcatSensorEntityDescription(
+        key="events_fetched",
+        translation_key="events_fetched",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_stats(lambda stats: stats.events_fetched),
+    ),
+    CelcatSensorEntityDescription(
+        key="events_changed",
+        translation_key="events_changed",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_stats(lambda stats: stats.events_changed),
+    ),
+    CelcatSensorEntityDescription(
+        key="requests",
+        translation_key="requests",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_stats(lambda stats: stats.requests),
+    ),
+    CelcatSensorEntityDescription(
+        key="events_in_memory",
+        translation_key="events_in_memory",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: len((coordinator.data or {}).get("all", [])),
+    ),
+)
+
+STORE_SIZE_SENSOR = SensorEntityDescription(
+    key="store_size",
+    translation_key="store_size",
+    device_class=SensorDeviceClass.DATA_SIZE,
+    state_class=SensorStateClass.MEASUREMENT,
+    native_unit_of_measurement=UnitOfInformation.BYTES,
+    suggested_unit_of_measurement=UnitOfInformation.KIBIBYTES,
+    suggested_display_precision=0,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: CelcatConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the celcat sensor platform."""
+    coordinator = entry.runtime_data.coordinator
+    entities: list[CelcatSensorEntity] = [
+        CelcatRefreshSensorEntity(coordinator, entry, description)
+        for description in SENSORS
+    ]
+    entities.append(CelcatStoreSizeSensorEntity(coordinator, entry, STORE_SIZE_SENSOR))
+    async_add_entities(entities, True)
+
+
+class CelcatSensorEntity(SensorEntity):
+    """A diagnostic sensor of a Celcat calendar, updated after each refresh."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: CelcatDataUpdateCoordinator,
+        entry: CelcatConfigEntry,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}-{description.key}"
+        self._attr_device_info = DeviceInfo(
+            entry_type=DeviceEntryType.SERVICE,
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer="Celcat",
+        )
+        self._signal = SIGNAL_REFRESH_FINISHED.format(entry.entry_id)
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to refreshes."""
+        await super().async_added_to_hass()
+        # The signal is sent after every refresh, while the listeners of the
+        # coordinator are not notified of unchanged refreshes
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self._signal, self._handle_update)
+        )
+
+    @callback
+    def _handle_update(self) -> None:
+        """Update the state."""
+        self.async_schedule_update_ha_state(True)
+
+
+class CelcatRefreshSensorEntity(CelcatSensorEntity):
+    """A sensor of the statistics of the last refresh."""
+
+    entity_description: CelcatSensorEntityDescription
+
+    async def async_update(self) -> None:
+        """Read the value from the coordinator."""
+        self._attr_native_value = self.entity_description.value_fn(self.coordinator)
+
+
+class CelcatStoreSizeSensorEntity(CelcatSensorEntity):
+    """A sensor of the size of the store on disk."""
+
+    async def async_update(self) -> None:
+        """Read the size of the store files."""
+        self._attr_native_value = await self.hass.async_add_executor_job(
+            self.coordinator.store.get_disk_size
+        )
@@ -0,0 +1,159 @@
+"""Services for the Celcat Calendar integration."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import tracemalloc
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_SORT,
+    ATTR_TRACE_MEMORY,
+    DOMAIN,
+    PROFILE_SORTS,
+    SERVICE_PROFILE_REFRESH,
+)
+from .coordinator import CelcatConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_FILE_FORMAT = "{domain}_profile_{entry_id}_{time}"
+REPORT_LINES = 100
+TRACEMALLOC_FRAMES = 10
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_TRACE_MEMORY, default=False): cv.boolean,
+        vol.Optional(ATTR_SORT, default=PROFILE_SORTS[0]): vol.In(PROFILE_SORTS),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_profile_refresh(call: ServiceCall) -> ServiceResponse:
+        """Profile a refresh of an entry, and write the reports."""
+        entry = _async_get_entry(hass, call.data[ATTR_CONFIG_ENTRY_ID])
+        coordinator = entry.runtime_data.coordinator
+        trace_memory = call.data[ATTR_TRACE_MEMORY]
+
+        # The profiler sees the whole event loop during the refresh, and the
+        # executor threads too on Python 3.12 and later. Leave the memory
+        # tracing of other tools running.
+        start_tracing = trace_memory and not tracemalloc.is_tracing()
+        profiler = cProfile.Profile()
+        if start_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        try:
+            try:
+                profiler.enable()
+            except ValueError as err:
+                raise HomeAssistantError(
+                    translation_domain=DOMAIN, translation_key="profiler_busy"
+                ) from err
+            try:
+                await coordinator.async_refresh()
+            finally:
+                profiler.disable()
+
+            snapshot = (
+                await hass.async_add_executor_job(tracemalloc.take_snapshot)
+                if trace_memory
+                else None
+            )
+        finally:
+            if start_tracing:
+                tracemalloc.stop()
+
+        path = hass.config.path(
+            PROFILE_FILE_FORMAT.format(
+                domain=DOMAIN,
+                entry_id=entry.entry_id,
+                time=dt_util.utcnow().strftime("%Y%m%d%H%M%S"),
+            )
+        )
+        summary = str(coordinator.refresh_stats[-1])
+        files = await hass.async_add_executor_job(
+            _write_reports, path, summary, profiler, snapshot, call.data[ATTR_SORT]
+        )
+        _LOGGER.info("Profile of calendar %s written to %s", coordinator.name, files)
+        return files
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def _async_get_entry(hass: HomeAssistant, entry_id: str) -> CelcatConfigEntry:
+    """Return a loaded entry of the integration."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_found",
+            translation_placeholders={"entry_id": entry_id},
+        )
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_loaded",
+            translation_placeholders={"title": entry.title},
+        )
+    return entry
+
+
+def _write_reports(
+    path: str,
+    summary: str,
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot | None,
+    sort: str,
+) -> dict[str, str]:
+    """Write the profile and allocation reports, in the executor.
+
+    The report is readable as is, while the statistics and the snapshot can
+    be loaded by pstats and tracemalloc for a closer look.
+    """
+    files = {"report": f"{path}.txt", "stats": f"{path}.prof"}
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(files["stats"])
+
+    with open(files["report"], "w", encoding="utf-8") as file:
+        file.write(f"Refresh: {summary}\n\n")
+        stats.stream = file
+        stats.sort_stats(sort).print_stats(REPORT_LINES)
+
+        if snapshot is not None:
+            file.write("Allocations by line:\n")
+            for statistic in snapshot.statistics("lineno")[:REPORT_LINES]:
+                file.write(f"{statistic}\n")
+
+    if snapshot is not None:
+        files["snapshot"] = f"{path}.tracemalloc"
+        snapshot.dump(files["snapshot"])
+
+    return files
@@ -0,0 +1,77 @@
+"""Refresh statistics for Celcat Calendar."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+REFRESH_STATS_SIZE = 20
+
+
+@dataclass
+class CelcatRefreshStats:
+    """Timings and counters of a refresh.
+
+    Phases are timed with the monotonic clock, in seconds, and a phase timed
+    several times adds up.
+    """
+
+    started: datetime
+    full: bool = False
+    success: bool = False
+    duration: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+    requests: int = 0
+    payload_bytes: int = 0
+    weeks: int = 0
+    processed_weeks: int = 0
+    events_fetched: int = 0
+    events_changed: int = 0
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the refresh."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def finish(self, requests: int) -> None:
+        """Record the duration of the refresh and the requests it made."""
+        self.duration = time.perf_counter() - self._start
+        self.requests = requests
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics as a JSON serializable dict."""
+        stats = asdict(self)
+        del stats["_start"]
+        stats["started"] = self.started.isoformat()
+        return stats
+
+    def __str__(self) -> str:
+        """Return a summary of the statistics for the log."""
+        phases = ", ".join(
+            f"{name} {duration:.3f}s" for name, duration in self.phases.items()
+        )
+        return (
+            f"{'full' if self.full else 'near-term'} refresh took "
+            f"{self.duration:.3f}s ({phases}), {self.requests} requests, "
+            f"{self.payload_bytes} bytes, {self.processed_weeks}/{self.weeks} weeks "
+            f"processed, {self.events_fetched} events fetched, "
+            f"{self.events_changed} changed"
+        )
+
+
+def time_phase(
+    stats: CelcatRefreshStats | None, name: str
+) -> AbstractContextManager[None]:
+    """Time a phase of a refresh, if the work is part of one."""
+    if stats is None:
+        return nullcontext()
+    return stats.phase(name)
@@ -3,43 +3,757 @@
 from __future__ import annotations
 
 import logging
+import os
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.storage import Store
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util.json import json_loads
 
 from .const import DOMAIN
+from .diff import hash_event
+from .model import CelcatEvent
 
 _LOGGER = logging.getLogger(__name__)
 
 STORAGE_KEY_FORMAT = "{domain}.{entry_id}"
-STORAGE_VERSION = 1
+STORAGE_VERSION = 2
 
+SHARD_KEY_FORMAT = "{key}.{week}"
+MANIFEST_KEY_FORMAT = "{key}.weeks"
+MANIFEST_VERSION = 1
 
-class CelcatStore:
-    """Storage for local persistence of calendar and event data."""
+AUTH_KEY_FORMAT = "{domain}.{entry_id}.auth"
+AUTH_VERSION = 1
 
-    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
-        """Initialize CelcatStore."""
-        self._store = Store[list[dict[str, Any]]](
+FINGERPRINTS_KEY_FORMAT = "{domain}.{entry_id}.fingerprints"
+FINGERPRINTS_VERSION = 1
+
+STRIPS_KEY_FORMAT = "{domain}.{entry_id}.strips"
+STRIPS_VERSION = 1
+
+RAW_KEY_FORMAT = "{domain}.{entry_id}.raw"
+ARCHIVE_KEY_FORMAT = "{domain}.{entry_id}.archive"
+
+SAVE_DELAY = 10
+LOG_FILE_FORMAT = "{key}.log"
+LOG_COMPACT_RECORDS = 50
+
+EPOCH = datetime(1970, 1, 1)
+
+type CelcatEventStore = CelcatStore | CelcatShardedStore
+
+
+def _parse_event(event: dict[str, Any]) -> CelcatEvent:
+    """Parse an event stored as a dict with ISO formatted dates."""
+    return CelcatEvent.from_event(
+        {
+            **event,
+            "start": datetime.fromisoformat(event["start"]),
+            "end": datetime.fromisoformat(event["end"]),
+        }
+    )
+
+
+def _encode_date(value: datetime) -> int | str:
+    """Encode a date as seconds since the epoch, in wall clock time."""
+    if value.tzinfo is not None:
+        return value.isoformat()
+    return (value - EPOCH) // timedelta(seconds=1)
+
+
+def _decode_date(value: int | str) -> datetime:
+    """Decode a date encoded by _encode_date."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return EPOCH + timedelta(seconds=value)
+
+
+def encode_events(events: Iterable[CelcatEvent]) -> dict[str, Any]:
+    """Encode events to the compact storage format.
+
+    Each event is stored as a row of its values. Dates are stored as
+    integers, and other strings as indexes in a table of unique strings.
+    """
+    strings: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    rows = [
+        [
+            event.id,
+            _encode_date(event.start),
+            _encode_date(event.end),
+            event.all_day,
+            intern(event.category),
+            intern(event.course),
+            [intern(room) for room in event.rooms],
+            [intern(professor) for professor in event.professors],
+            [intern(module) for module in event.modules],
+            intern(event.department),
+            [intern(site) for site in event.sites],
+            intern(event.faculty),
+            intern(event.notes),
+        ]
+        for event in events
+    ]
+    return {"strings": list(strings), "events": rows}
+
+
+def decode_events(data: dict[str, Any]) -> list[CelcatEvent]:
+    """Decode events from the compact storage format."""
+    strings = [sys.intern(string) for string in data["strings"]]
+    return [
+        CelcatEvent(
+            event_id,
+            _decode_date(start),
+            _decode_date(end),
+            all_day,
+            strings[category],
+            strings[course],
+            [strings[room] for room in rooms],
+            [strings[professor] for professor in professors],
+            [strings[module] for module in modules],
+            strings[department],
+            [strings[site] for site in sites],
+            strings[faculty],
+            strings[notes],
+        )
+        for (
+            event_id,
+            start,
+            end,
+            all_day,
+            category,
+            course,
+            rooms,
+            professors,
+            modules,
+            department,
+            sites,
+            faculty,
+            notes,
+        ) in data["events"]
+    ]
+
+
+def get_week(day: date) -> str:
+    """Return the ISO week of a date."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _get_weeks(start: date, end: date) -> set[str]:
+    """Return the ISO weeks overlapping a date range."""
+    weeks = set()
+    day = date.fromordinal(start.toordinal() - start.weekday())
+    while day <= end:
+        weeks.add(get_week(day))
+        day = date.fromordinal(day.toordinal() + 7)
+    return weeks
+
+
+def _hash_week(events: Iterable[CelcatEvent]) -> int:
+    """Return a hash of the content of a week."""
+    return hash(frozenset(hash_event(event) for event in events))
+
+
+class _EventsStore(Store[dict[str, Any]]):
+    """Store of events in the compact format."""
+
+    async def _async_migrate_func(
+        self,
+        old_major_version: int,
+        old_minor_version: int,
+        old_data: Any,
+    ) -> dict[str, Any]:
+        """Migrate events stored with a previous format to the compact format."""
+        if old_major_version == 1:
+            if isinstance(old_data, list):
+                # Events stored as a list of dicts
+                return encode_events(_parse_event(event) for event in old_data)
+            if "years" in old_data:
+                # Archived events stored by academic year
+                return encode_events(
+                    event
+                    for events in old_data["years"].values()
+                    for event in decode_events(events)
+                )
+        return old_data
+
+
+async def async_get_store(
+    hass: HomeAssistant, entry_id: str, sharded: bool
+) -> CelcatEventStore:
+    """Return the store of an entry, moving events stored with the other layout."""
+    store: CelcatEventStore
+    if sharded:
+        store = CelcatShardedStore(hass, entry_id)
+        previous_store = CelcatStore(hass, entry_id)
+    else:
+        store = CelcatStore(hass, entry_id)
+        previous_store = CelcatShardedStore(hass, entry_id)
+
+    await store.async_move_events(previous_store)
+    return store
+
+
+class _CelcatEvents(ABC):
+    """Events stored under a key, with one of the storage layouts."""
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the events."""
+        self.hass = hass
+        self.key = key
+
+    @abstractmethod
+    async def async_exists(self) -> bool:
+        """Return whether events were saved, without loading them."""
+
+    @abstractmethod
+    async def async_load(self) -> list[CelcatEvent] | None:
+        """Load the events, or None if they were never saved."""
+
+    @abstractmethod
+    async def async_load_range(self, start: date, end: date) -> list[CelcatEvent]:
+        """Load the events starting within a date range."""
+
+    @abstractmethod
+    async def async_save(self, events: list[CelcatEvent]) -> None:
+        """Save the events."""
+
+    @abstractmethod
+    async def async_write(self) -> None:
+        """Write the events which were saved with a delay now."""
+
+    @abstractmethod
+    def unload(self) -> None:
+        """Drop the loaded events from memory."""
+
+    @abstractmethod
+    async def async_remove(self) -> None:
+        """Remove the stored events."""
+
+
+class _MonolithicEvents(_CelcatEvents):
+    """Events stored in a single file, written in full after a delay."""
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the events."""
+        super().__init__(hass, key)
+        self._store = _EventsStore(hass, STORAGE_VERSION, key, private=True)
+        self._data: list[CelcatEvent] | None = None
+        self._loaded = False
+        self._unsaved: list[CelcatEvent] | None = None
+
+    async def async_exists(self) -> bool:
+        """Return whether events were saved, without loading them."""
+        if self._loaded or self._unsaved is not None:
+            return self._data is not None or self._unsaved is not None
+        return await self.hass.async_add_executor_job(os.path.exists, self._store.path)
+
+    async def async_load(self) -> list[CelcatEvent] | None:
+        """Load the events, or None if they were never saved."""
+        if not self._loaded:
+            if self._unsaved is not None:
+                self._data = self._unsaved
+            elif (data := await self._store.async_load()) is not None:
+                self._data = decode_events(data)
+            self._loaded = True
+        return self._data
+
+    async def async_load_range(self, start: date, end: date) -> list[CelcatEvent]:
+        """Load the events starting within a date range."""
+        return [
+            event
+            for event in await self.async_load() or []
+            if start <= event.start.date() <= end
+        ]
+
+    async def async_save(self, events: list[CelcatEvent]) -> None:
+        """Save the events after a delay."""
+        self._data = events
+        self._loaded = True
+        self._unsaved = events
+        self._store.async_delay_save(self._encode_unsaved, SAVE_DELAY)
+
+    @callback
+    def _encode_unsaved(self) -> dict[str, Any]:
+        """Encode the events which are being written."""
+        events, self._unsaved = self._unsaved, None
+        return encode_events(events or [])
+
+    async def async_write(self) -> None:
+        """Write the events which were saved with a delay now."""
+        if self._unsaved is not None:
+            await self._store.async_save(self._encode_unsaved())
+
+    def unload(self) -> None:
+        """Drop the loaded events from memory.
+
+        Events not yet written are kept until they are.
+        """
+        self._data = None
+        self._loaded = False
+
+    async def async_remove(self) -> None:
+        """Remove the stored events."""
+        self.unload()
+        self._unsaved = None
+        await self._store.async_remove()
+
+
+class _ShardedEvents(_CelcatEvents):
+    """Events sharded by ISO week, with an append-only change log.
+
+    Saving only appends the weeks which changed to the log, right away.
+    Once the log holds enough records, it is compacted: the changed weeks
+    are written to their own shard and the log is truncated. Loading a date
+    range only decodes the shards and the log records of the weeks it
+    overlaps.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the events."""
+        super().__init__(hass, key)
+        self._manifest = Store[dict[str, Any]](
             hass,
-            STORAGE_VERSION,
-            STORAGE_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id),
+            MANIFEST_VERSION,
+            MANIFEST_KEY_FORMAT.format(key=key),
             private=True,
         )
-        self._data: list[dict[str, Any]] | None = None
+        self._log_path = hass.config.path(STORAGE_DIR, LOG_FILE_FORMAT.format(key=key))
+        self._shards: dict[str, _EventsStore] = {}
+        self._weeks: dict[str, list[CelcatEvent]] | None = None
+        self._hashes: dict[str, int] = {}
+        self._stored_weeks: set[str] = set()
+        self._logged_weeks: dict[str, str] = {}
+        self._log_records = 0
+        self._data: list[CelcatEvent] | None = None
 
-    async def async_load(self) -> list[dict[str, Any]] | None:
-        """Load data."""
+    def unload(self) -> None:
+        """Drop the loaded events from memory.
+
+        The stored weeks and the change log are read again on the next load.
+        """
+        self._shards = {}
+        self._weeks = None
+        self._hashes = {}
+        self._stored_weeks = set()
+        self._logged_weeks = {}
+        self._log_records = 0
+        self._data = None
+
+    def _get_shard(self, week: str) -> _EventsStore:
+        """Return the store of a week."""
+        if week not in self._shards:
+            self._shards[week] = _EventsStore(
+                self.hass,
+                STORAGE_VERSION,
+                SHARD_KEY_FORMAT.format(key=self.key, week=week),
+                private=True,
+            )
+        return self._shards[week]
+
+    def _read_log(self) -> tuple[dict[str, str], int]:
+        """Read the records of the change log, without decoding them.
+
+        Returns the last encoded events logged for each week, and the number
+        of records in the log.
+        """
+        if not os.path.exists(self._log_path):
+            return {}, 0
+
+        weeks: dict[str, str] = {}
+        records = 0
+        with open(self._log_path, encoding="utf-8") as log_file:
+            for line in log_file:
+                if not line.endswith("\n"):
+                    _LOGGER.warning("Ignoring truncated change log record")
+                    continue
+                records += 1
+                week, separator, data = line.partition("\t")
+                if separator:
+                    weeks[week] = data
+                    continue
+
+                # Records logged with their week inside
+                try:
+                    record = json_loads(line)
+                except ValueError:
+                    _LOGGER.warning("Ignoring truncated change log record")
+                    continue
+                week = record.pop("week")
+                if "strings" not in record:
+                    record = encode_events(
+                        _parse_event(event) for event in record["events"]
+                    )
+                weeks[week] = json_dumps(record)
+        return weeks, records
+
+    def _append_log(self, lines: list[str]) -> None:
+        """Append records to the change log, only readable by its owner."""
+        os.makedirs(os.path.dirname(self._log_path), exist_ok=True)
+        fd = os.open(self._log_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "a+b") as log_file:
+            if end := log_file.seek(0, os.SEEK_END):
+                log_file.seek(end - 1)
+                if log_file.read(1) != b"\n":
+                    # Drop the record truncated by an interrupted write
+                    log_file.seek(0)
+                    log_file.truncate(log_file.read().rfind(b"\n") + 1)
+            log_file.write("".join(lines).encode("utf-8"))
+
+    def _truncate_log(self) -> None:
+        """Remove the change log."""
+        if os.path.exists(self._log_path):
+            os.remove(self._log_path)
+
+    async def _async_load_manifest(self) -> None:
+        """Load the stored weeks and replay the change log."""
+        if self._weeks is not None:
+            return
+
+        manifest = await self._manifest.async_load() or {}
+        self._stored_weeks = set(manifest.get("weeks", []))
+        self._weeks = {}
+
+        self._logged_weeks, self._log_records = await self.hass.async_add_executor_job(
+            self._read_log
+        )
+
+    def _decode_logged_week(self, week: str) -> dict[str, Any] | None:
+        """Decode the record of a week in the change log, if any."""
+        if (data := self._logged_weeks.get(week)) is None:
+            return None
+        try:
+            return json_loads(data)
+        except ValueError:
+            _LOGGER.warning("Ignoring truncated change log record of %s", week)
+            del self._logged_weeks[week]
+            return None
+
+    async def _async_load_weeks(self, weeks: Iterable[str]) -> None:
+        """Load the events of the given weeks."""
+        await self._async_load_manifest()
+
+        for week in weeks:
+            if week in self._weeks:
+                continue
+
+            if (data := self._decode_logged_week(week)) is not None:
+                events = decode_events(data)
+            elif week in self._stored_weeks:
+                data = await self._get_shard(week).async_load()
+                events = decode_events(data) if data else []
+            else:
+                continue
+
+            self._weeks[week] = events
+            self._hashes[week] = _hash_week(events)
+
+    def _files_exist(self) -> bool:
+        """Return whether the manifest or the change log exist."""
+        return os.path.exists(self._manifest.path) or os.path.exists(self._log_path)
+
+    async def async_exists(self) -> bool:
+        """Return whether events were saved, without loading them."""
+        if self._weeks is not None:
+            return bool(self._stored_weeks or self._logged_weeks)
+        return await self.hass.async_add_executor_job(self._files_exist)
+
+    async def async_load(self) -> list[CelcatEvent] | None:
+        """Load the events, or None if they were never saved."""
         if self._data is None:
-            self._data = await self._store.async_load() or []
+            await self._async_load_manifest()
+            if not self._stored_weeks and not self._logged_weeks:
+                return None
+            await self._async_load_weeks(self._stored_weeks | self._logged_weeks.keys())
+            self._data = [
+                event for week in sorted(self._weeks) for event in self._weeks[week]
+            ]
         return self._data
 
-    async def async_save(self, data: list[dict[str, Any]]) -> None:
+    async def async_load_range(self, start: date, end: date) -> list[CelcatEvent]:
+        """Load the events starting within a date range."""
+        weeks = _get_weeks(start, end)
+        await self._async_load_weeks(weeks)
+        return [
+            event
+            for week in sorted(weeks & self._weeks.keys())
+            for event in self._weeks[week]
+            if start <= event.start.date() <= end
+        ]
+
+    async def async_save(self, events: list[CelcatEvent]) -> None:
+        """Save the events, appending the weeks which changed to the log."""
+        await self.async_load()
+        self._data = events
+
+        weeks: dict[str, list[CelcatEvent]] = {}
+        for event in events:
+            weeks.setdefault(get_week(event.start.date()), []).append(event)
+        hashes = {week: _hash_week(week_events) for week, week_events in weeks.items()}
+
+        changed_weeks = sorted(
+            week
+            for week in hashes.keys() | self._hashes.keys()
+            if hashes.get(week) != self._hashes.get(week)
+        )
+        self._weeks = weeks
+        self._hashes = hashes
+        if not changed_weeks:
+            return
+
+        records = {
+            week: json_dumps(encode_events(weeks.get(week, [])))
+            for week in changed_weeks
+        }
+        await self.hass.async_add_executor_job(
+            self._append_log,
+            [f"{week}\t{data}\n" for week, data in records.items()],
+        )
+        _LOGGER.debug(
+            "Appended %s changed weeks to the change log of %s", len(records), self.key
+        )
+
+        self._logged_weeks.update(records)
+        self._log_records += len(records)
+
+        if self._log_records >= LOG_COMPACT_RECORDS:
+            await self._async_compact()
+
+    async def async_write(self) -> None:
+        """Write the events which were saved with a delay now.
+
+        Changes are appended to the log when saved, nothing is delayed.
+        """
+
+    async def _async_compact(self) -> None:
+        """Write the logged weeks to their shards and truncate the log."""
+        _LOGGER.debug("Compacting %s logged weeks", len(self._logged_weeks))
+
+        for week in list(self._logged_weeks):
+            if (data := self._decode_logged_week(week)) is None:
+                continue
+            if data["events"]:
+                await self._get_shard(week).async_save(data)
+                self._stored_weeks.add(week)
+            elif week in self._stored_weeks:
+                await self._get_shard(week).async_remove()
+                self._stored_weeks.discard(week)
+
+        await self._manifest.async_save({"weeks": sorted(self._stored_weeks)})
+        await self.hass.async_add_executor_job(self._truncate_log)
+
+        self._logged_weeks = {}
+        self._log_records = 0
+
+    async def async_remove(self) -> None:
+        """Remove the stored events."""
+        await self._async_load_manifest()
+        for week in self._stored_weeks:
+            await self._get_shard(week).async_remove()
+        await self._manifest.async_remove()
+        await self.hass.async_add_executor_job(self._truncate_log)
+        self.unload()
+
+
+class _CelcatBaseStore(ABC):
+    """Storage of the events of an entry and of the data kept alongside them.
+
+    The calendar events, the raw events and the archived events are stored
+    with the layout of the store. The other data is saved with a delay, so
+    that the data saved by a refresh is written once, after a delay, when
+    the entry is unloaded or when Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self.hass = hass
+        self._entry_id = entry_id
+        self._auth_store = Store[dict[str, Any]](
+            hass,
+            AUTH_VERSION,
+            AUTH_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id),
+            private=True,
+        )
+        self._fingerprints_store = Store[dict[str, Any]](
+            hass,
+            FINGERPRINTS_VERSION,
+            FINGERPRINTS_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id),
+            private=True,
+        )
+        self._strips_store = Store[list[str]](
+            hass,
+            STRIPS_VERSION,
+            STRIPS_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id),
+            private=True,
+        )
+        self._events = self._create_events(
+            STORAGE_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id)
+        )
+        self._raw_events = self._create_events(
+            RAW_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id)
+        )
+        self._archived_events = self._create_events(
+            ARCHIVE_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id)
+        )
+        self._pending: dict[Store[Any], Callable[[], Any]] = {}
+
+    @abstractmethod
+    def _create_events(self, key: str) -> _CelcatEvents:
+        """Return the events stored under a key, with the layout of the store."""
+
+    @property
+    def _all_events(self) -> tuple[_CelcatEvents, ...]:
+        """Return every kind of stored events."""
+        return (self._events, self._raw_events, self._archived_events)
+
+    async def async_move_events(self, other: _CelcatBaseStore) -> None:
+        """Move the events stored with the layout of another store."""
+        for events, other_events in zip(
+            self._all_events, other._all_events, strict=True
+        ):
+            if await events.async_exists() or not await other_events.async_exists():
+                continue
+            _LOGGER.info("Moving %s to the new storage layout", events.key)
+            await events.async_save(await other_events.async_load() or [])
+            await events.async_write()
+            await other_events.async_remove()
+
+    def _async_delay_save(
+        self, store: Store[Any], data_func: Callable[[], Any]
+    ) -> None:
+        """Save the data of a store after a delay.
+
+        The data is only generated when it is written.
+        """
+        self._pending[store] = data_func
+        store.async_delay_save(lambda: self._get_pending_data(store), SAVE_DELAY)
+
+    @callback
+    def _get_pending_data(self, store: Store[Any]) -> Any:
+        """Return the data of a store which is being written."""
+        return self._pending.pop(store)()
+
+    async def async_flush(self) -> None:
+        """Write the data which was saved with a delay now."""
+        pending, self._pending = self._pending, {}
+        for store, data_func in pending.items():
+            await store.async_save(data_func())
+        for events in self._all_events:
+            await events.async_write()
+
+    async def async_has_events(self) -> bool:
+        """Return whether events were saved, without loading them."""
+        return await self._events.async_exists()
+
+    async def async_load(self) -> list[CelcatEvent]:
+        """Load data."""
+        return await self._events.async_load() or []
+
+    async def async_load_range(self, start: date, end: date) -> list[CelcatEvent]:
+        """Load the events starting within a date range."""
+        return await self._events.async_load_range(start, end)
+
+    async def async_save(self, data: list[CelcatEvent]) -> None:
         """Save data."""
-        self._data = data
-        await self._store.async_save(data)
+        await self._events.async_save(data)
+
+    async def async_load_auth(self) -> dict[str, Any] | None:
+        """Load the authentication state of the Celcat session."""
+        return await self._auth_store.async_load()
+
+    async def async_save_auth(self, auth: dict[str, Any]) -> None:
+        """Save the authentication state of the Celcat session."""
+        self._async_delay_save(self._auth_store, lambda: auth)
+
+    async def async_load_fingerprints(self) -> dict[str, Any] | None:
+        """Load the fingerprints of the raw Celcat data of each week."""
+        return await self._fingerprints_store.async_load()
+
+    async def async_save_fingerprints(self, fingerprints: dict[str, Any]) -> None:
+        """Save the fingerprints of the raw Celcat data of each week."""
+        self._async_delay_save(self._fingerprints_store, lambda: fingerprints)
+
+    async def async_load_remembered_strips(self) -> list[str] | None:
+        """Load the course strips remembered by the filters."""
+        return await self._strips_store.async_load()
+
+    async def async_save_remembered_strips(self, remembered_strips: list[str]) -> None:
+        """Save the course strips remembered by the filters."""
+        self._async_delay_save(self._strips_store, lambda: remembered_strips)
+
+    async def async_load_raw(self) -> list[CelcatEvent] | None:
+        """Load the events as fetched from Celcat, before filtering."""
+        return await self._raw_events.async_load()
+
+    async def async_save_raw(self, events: list[CelcatEvent]) -> None:
+        """Save the events as fetched from Celcat, before filtering."""
+        await self._raw_events.async_save(events)
+
+    async def async_load_archive(self) -> list[CelcatEvent]:
+        """Load the archived events of the past academic years."""
+        return await self._archived_events.async_load() or []
+
+    async def async_save_archive(self, events: list[CelcatEvent]) -> None:
+        """Save the archived events of the past academic years."""
+        await self._archived_events.async_save(events)
+
+    def unload_archive(self) -> None:
+        """Drop the archived events from memory."""
+        self._archived_events.unload()
+
+    def get_disk_size(self) -> int:
+        """Return the size of the files of the entry on disk, in bytes.
+
+        Data not yet written is not counted. Must be run in the executor.
+        """
+        prefix = STORAGE_KEY_FORMAT.format(domain=DOMAIN, entry_id=self._entry_id)
+        try:
+            with os.scandir(self.hass.config.path(STORAGE_DIR)) as files:
+                return sum(
+                    file.stat().st_size
+                    for file in files
+                    if file.name == prefix or file.name.startswith(f"{prefix}.")
+                )
+        except FileNotFoundError:
+            return 0
 
     async def async_remove(self) -> None:
         """Remove data."""
-        await self._store.async_remove()
+        self._pending = {}
+        for events in self._all_events:
+            await events.async_remove()
+        await self._auth_store.async_remove()
+        await self._fingerprints_store.async_remove()
+        await self._strips_store.async_remove()
+
+
+class CelcatStore(_CelcatBaseStore):
+    """Storage for local persistence of calendar and event data.
+
+    Each kind of events is stored in a single file.
+    """
+
+    def _create_events(self, key: str) -> _CelcatEvents:
+        """Return the events stored in a single file."""
+        return _MonolithicEvents(self.hass, key)
+
+
+class CelcatShardedStore(_CelcatBaseStore):
+    """Storage sharded by ISO week, with an append-only change log.
+
+    Each kind of events is sharded separately.
+    """
+
+    def _create_events(self, key: str) -> _CelcatEvents:
+        """Return the events sharded by ISO week."""
+        return _ShardedEvents(self.hass, key)
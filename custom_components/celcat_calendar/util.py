@@ -1,5 +1,9 @@
 """Utils for Celcat Calendar"""
 
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
 from .const import DOMAIN
 
 
@@ -13,6 +17,11 @@ async def list_to_dict(lst: list[str]) -> dict[str, str]:
         ) from exc
 
 
+def as_wall_clock(value: datetime) -> datetime:
+    """Return a datetime as a naive local time, like the dates of Celcat events."""
+    return dt_util.as_local(value).replace(tzinfo=None)
+
+
 def get_translation(translations: dict[str, str], key: str) -> str:
     """Get translation with fallback to English."""
     return translations.get(